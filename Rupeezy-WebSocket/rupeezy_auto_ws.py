@@ -1,14 +1,19 @@
 import json, struct, logging, sys, time, requests, pyotp, websocket, os
 
+# Shared DSG config lives at the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import get_settings
+
 # ===========================================================
 # CONFIGURATION
 # ===========================================================
+_settings = get_settings()
 CONFIG = {
-    "CLIENT_CODE": os.getenv("RUPEEZY_CLIENT_CODE"),
-    "PASSWORD": os.getenv("RUPEEZY_PASSWORD"),
-    "TOTP_SECRET": os.getenv("RUPEEZY_TOTP_SECRET"),
-    "API_KEY": os.getenv("RUPEEZY_API_KEY"),
-    "APP_ID": os.getenv("RUPEEZY_APPLICATION_ID"),
+    "CLIENT_CODE": _settings.rupeezy_client_code,
+    "PASSWORD": _settings.rupeezy_password,
+    "TOTP_SECRET": _settings.rupeezy_totp_secret,
+    "API_KEY": _settings.rupeezy_api_key,
+    "APP_ID": _settings.rupeezy_application_id,
 }
 
 # ===========================================================
@@ -23,6 +28,31 @@ logging.basicConfig(
 # ===========================================================
 # LOGIN FUNCTION
 # ===========================================================
+TOKEN_FILE = "access_token.txt"
+TOKEN_MAX_AGE = _settings.rupeezy_token_max_age  # seconds
+
+
+def load_cached_token(max_age=TOKEN_MAX_AGE):
+    """Return the token saved by the last login if it is younger than max_age seconds."""
+    try:
+        if time.time() - os.path.getmtime(TOKEN_FILE) > max_age:
+            return None
+        with open(TOKEN_FILE) as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def get_token(force_refresh=False):
+    """Cached login: reuse access_token.txt unless it is stale or a refresh is forced."""
+    if not force_refresh:
+        token = load_cached_token()
+        if token:
+            logging.info("🔑 Using cached access token.")
+            return token
+    return login_and_get_token()
+
+
 def login_and_get_token(retry=False):
     """Authenticate with Rupeezy using TOTP and return access token."""
     try:
@@ -59,7 +89,7 @@ def login_and_get_token(retry=False):
 
             sys.exit("❌ Login failed after retry. Exiting.")
 
-        with open("access_token.txt", "w") as f:
+        with open(TOKEN_FILE, "w") as f:
             f.write(access_token)
         logging.info("✅ Login successful. Token saved to access_token.txt.")
         return access_token
@@ -0,0 +1,279 @@
+import json, struct, logging, random, sys, threading, time
+
+import websocket
+
+from rupeezy_auto_ws import decode_ltp_packet, get_token
+from config import get_settings
+
+# ===========================================================
+# CONFIGURATION
+# ===========================================================
+WS_URL = "wss://wire.rupeezy.in/ws?auth_token={token}"
+MAX_TOKENS_PER_CONNECTION = get_settings().rupeezy_ws_max_tokens
+BACKOFF_BASE = 1.0    # seconds
+BACKOFF_CAP = 60.0    # seconds
+STALE_AFTER = get_settings().rupeezy_ws_stale_after  # seconds without a tick
+
+
+# ===========================================================
+# PACKET SPLITTING
+# ===========================================================
+def iter_packets(message):
+    """Yield the payload of each length-prefixed packet (2-byte little-endian size)."""
+    offset = 0
+    while offset + 2 <= len(message):
+        size = struct.unpack("<H", message[offset:offset + 2])[0]
+        if size == 0 or offset + 2 + size > len(message):
+            # Not a size prefix we understand: treat the rest as one packet, as before.
+            yield message[offset + 2:]
+            return
+        yield message[offset + 2:offset + 2 + size]
+        offset += 2 + size
+
+
+# ===========================================================
+# SHARD (one WebSocket connection)
+# ===========================================================
+class FeedShard(threading.Thread):
+    """One WebSocket connection carrying up to MAX_TOKENS_PER_CONNECTION subscriptions."""
+
+    def __init__(self, manager, shard_id, mode="ltp"):
+        super().__init__(name=f"ws-shard-{shard_id}", daemon=True)
+        self.manager = manager
+        self.shard_id = shard_id
+        self.mode = mode
+        self.instruments = set()      # {(exchange, token)}
+        self.ws = None
+        self.connected = False
+        self.attempt = 0
+        self.auth_failed = False
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self):
+        return MAX_TOKENS_PER_CONNECTION - len(self.instruments)
+
+    def add(self, exchange, token):
+        with self._lock:
+            self.instruments.add((exchange, int(token)))
+        if self.connected:
+            self._send_subscribe([(exchange, int(token))])
+
+    def _send_subscribe(self, instruments):
+        for exchange, token in instruments:
+            self.ws.send(json.dumps({
+                "exchange": exchange,
+                "token": token,
+                "mode": self.mode,
+                "message_type": "subscribe",
+            }))
+
+    # ---- WebSocket callbacks ----
+    def on_open(self, ws):
+        self.connected = True
+        self.attempt = 0
+        with self._lock:
+            instruments = list(self.instruments)
+        logging.info(f"✅ Shard {self.shard_id} connected. Restoring {len(instruments)} subscriptions...")
+        self._send_subscribe(instruments)
+
+    def on_message(self, ws, message):
+        if isinstance(message, bytes):
+            for packet in iter_packets(message):
+                tick = decode_ltp_packet(packet)
+                if tick:
+                    self.manager.record_tick(tick["token"], tick["ltp"])
+        else:
+            logging.info(f"📩 Shard {self.shard_id} text message: {message}")
+
+    def on_error(self, ws, error):
+        text = str(error)
+        if "401" in text or "403" in text or "nauthorized" in text:
+            self.auth_failed = True
+        logging.error(f"❌ Shard {self.shard_id} error: {error}")
+
+    def on_close(self, ws, code, reason):
+        self.connected = False
+        self.manager.mark_disconnected(self)
+        logging.warning(f"🔚 Shard {self.shard_id} closed: {code} – {reason}")
+
+    # ---- Reconnect loop ----
+    def run(self):
+        while not self._stop_event.is_set():
+            token = self.manager.access_token(force_refresh=self.auth_failed)
+            self.auth_failed = False
+            if token:
+                self.ws = websocket.WebSocketApp(
+                    WS_URL.format(token=token),
+                    on_open=self.on_open,
+                    on_message=self.on_message,
+                    on_error=self.on_error,
+                    on_close=self.on_close,
+                )
+                try:
+                    self.ws.run_forever(ping_interval=25, ping_timeout=10)
+                except Exception as e:
+                    logging.error(f"⚠️ Shard {self.shard_id} crash: {e}")
+
+            if self._stop_event.is_set():
+                break
+            # Full-jitter exponential backoff so shards don't reconnect in lockstep.
+            delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** self.attempt))
+            self.attempt += 1
+            logging.info(f"🔁 Shard {self.shard_id} reconnecting in {delay:.1f}s (attempt {self.attempt})")
+            self._stop_event.wait(delay)
+
+    def stop(self):
+        self._stop_event.set()
+        if self.ws:
+            self.ws.close()
+
+
+# ===========================================================
+# CONNECTION MANAGER
+# ===========================================================
+class ConnectionManager:
+    """
+    Shards subscriptions across WebSocket connections and tracks per-token freshness.
+
+    Strategies should read prices through get_ltp(), which returns None for a
+    token that has not ticked within `stale_after` seconds.
+    """
+
+    def __init__(self, mode="ltp", stale_after=STALE_AFTER, on_tick=None):
+        self.mode = mode
+        self.stale_after = stale_after
+        self.on_tick = on_tick
+        self.shards = []
+        self.last_ltp = {}       # token -> ltp
+        self.last_seen = {}      # token -> monotonic time of last tick
+        self.gaps = {}           # token -> stale gaps / disconnects seen (missed-tick windows)
+        self._token = None
+        self._token_lock = threading.Lock()
+        self._lock = threading.Lock()
+
+    # ---- Authentication (shared across shards) ----
+    def access_token(self, force_refresh=False):
+        with self._token_lock:
+            if self._token is None or force_refresh:
+                try:
+                    self._token = get_token(force_refresh=force_refresh)
+                except SystemExit:
+                    # login_and_get_token exits on failure; keep the feed alive and back off instead.
+                    logging.error("❌ Token refresh failed; will retry after backoff.")
+                    self._token = None
+            return self._token
+
+    # ---- Subscriptions ----
+    def subscribe(self, exchange, token):
+        with self._lock:
+            shard = next((s for s in self.shards if s.capacity > 0), None)
+            if shard is None:
+                shard = FeedShard(self, len(self.shards), self.mode)
+                self.shards.append(shard)
+            shard.add(exchange, token)
+        return shard
+
+    def subscribe_many(self, instruments):
+        for exchange, token in instruments:
+            self.subscribe(exchange, token)
+
+    def start(self):
+        for shard in self.shards:
+            if not shard.is_alive():
+                shard.start()
+        logging.info(f"🌐 Started {len(self.shards)} shard(s) for "
+                     f"{sum(len(s.instruments) for s in self.shards)} instruments.")
+
+    def stop(self):
+        for shard in self.shards:
+            shard.stop()
+
+    # ---- Tick bookkeeping ----
+    def record_tick(self, token, ltp):
+        now = time.monotonic()
+        previous = self.last_seen.get(token)
+        if previous is not None and now - previous > self.stale_after:
+            self.gaps[token] = self.gaps.get(token, 0) + 1
+        self.last_ltp[token] = ltp
+        self.last_seen[token] = now
+        if self.on_tick:
+            self.on_tick(token, ltp)
+
+    @staticmethod
+    def _shard_tokens(shard):
+        """Locked snapshot of a shard's tokens (the WS thread may be editing them)."""
+        with shard._lock:
+            return [t for _, t in shard.instruments]
+
+    def mark_disconnected(self, shard):
+        """Everything on a dropped shard is stale until it ticks again."""
+        for token in self._shard_tokens(shard):
+            self.last_seen.pop(token, None)
+            self.gaps[token] = self.gaps.get(token, 0) + 1
+
+    def staleness(self, token):
+        """Seconds since the last tick for a token (inf if never seen / disconnected)."""
+        seen = self.last_seen.get(token)
+        return float("inf") if seen is None else time.monotonic() - seen
+
+    def get_ltp(self, token, max_age=None):
+        """Latest LTP, or None when older than max_age (defaults to stale_after)."""
+        max_age = self.stale_after if max_age is None else max_age
+        if self.staleness(token) > max_age:
+            return None
+        return self.last_ltp.get(token)
+
+    def stale_tokens(self, max_age=None):
+        max_age = self.stale_after if max_age is None else max_age
+        subscribed = [t for s in self.shards for t in self._shard_tokens(s)]
+        return [t for t in subscribed if self.staleness(t) > max_age]
+
+    def health(self):
+        return {
+            "shards": len(self.shards),
+            "connected": sum(1 for s in self.shards if s.connected),
+            "instruments": sum(len(self._shard_tokens(s)) for s in self.shards),
+            "stale": len(self.stale_tokens()),
+            "gaps": sum(self.gaps.values()),
+        }
+
+
+# ===========================================================
+# MAIN
+# ===========================================================
+def parse_instruments(spec):
+    """"NSE_EQ:26000,NSE_EQ:22" -> [("NSE_EQ", 26000), ("NSE_EQ", 22)]"""
+    pairs = []
+    for item in spec.split(","):
+        item = item.strip()
+        if item:
+            exchange, token = item.split(":")
+            pairs.append((exchange.strip(), int(token)))
+    return pairs
+
+
+if __name__ == "__main__":
+    settings = get_settings()
+    spec = sys.argv[1] if len(sys.argv) > 1 else settings.rupeezy_ws_instruments
+
+    # Optionally act as the single feed process for strategy processes on this host.
+    bus = None
+    bus_name = settings.rupeezy_tick_bus
+    if bus_name:
+        from storage.tick_bus import TickBusWriter
+        bus = TickBusWriter(bus_name)
+
+    manager = ConnectionManager(on_tick=bus.publish if bus else None)
+    manager.subscribe_many(parse_instruments(spec))
+    manager.start()
+    try:
+        while True:
+            time.sleep(30)
+            logging.info(f"🩺 Feed health: {manager.health()}")
+    except KeyboardInterrupt:
+        logging.info("🛑 Interrupted by user. Exiting gracefully.")
+        manager.stop()
+        if bus:
+            bus.close()
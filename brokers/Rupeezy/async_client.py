@@ -0,0 +1,159 @@
+# File: brokers/rupeezy/async_client.py
+"""
+aiohttp-based Rupeezy (Vortex) adapter implementing AsyncBrokerBase.
+
+All requests share one pooled ClientSession, so hundreds of quote and order
+calls can be in flight from a single thread. Existing synchronous strategies
+use it through SyncBrokerShim:
+
+    broker = SyncBrokerShim(RupeezyAsyncBroker.from_env())
+    broker.get_ltp("GOLDBEES")
+"""
+
+import asyncio
+import logging
+
+import aiohttp
+
+from brokers.broker_base import AsyncBrokerBase
+from config import get_settings
+from .instruments import lookup
+from .portfolio import parse_holdings
+
+BASE_URL = "https://vortex-api.rupeezy.in/v2"
+
+
+class RupeezyAPIError(RuntimeError):
+    """Raised when the Vortex API answers with an HTTP error status."""
+
+    def __init__(self, method: str, path: str, status: int, payload):
+        super().__init__(f"Rupeezy {method} {path} failed ({status}): {payload}")
+        self.status = status
+        self.payload = payload
+
+
+class RupeezyAsyncBroker(AsyncBrokerBase):
+    """
+    Args:
+        api_key (str): Rupeezy API key.
+        access_token (str): Session token from the daily login.
+        product (str): Product type for orders ("MTF", "DELIVERY", "INTRADAY").
+        max_in_flight (int): Upper bound on concurrent HTTP requests.
+    """
+
+    def __init__(self, api_key: str, access_token: str, product: str = "MTF",
+                 max_in_flight: int = None, base_url: str = BASE_URL):
+        self.api_key = api_key
+        self.access_token = access_token
+        self.product = product
+        self.base_url = base_url
+        self.max_in_flight = max_in_flight or get_settings().rupeezy_max_in_flight
+        self._session = None
+        self._semaphore = None
+
+    @classmethod
+    def from_env(cls, **kwargs):
+        settings = get_settings()
+        return cls(settings.rupeezy_api_key, settings.rupeezy_access_token, **kwargs)
+
+    # --------------------------------------------------------------
+    # Session handling
+    # --------------------------------------------------------------
+    async def _get_session(self):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                headers={
+                    "x-api-key": self.api_key,
+                    "Authorization": f"Bearer {self.access_token}",
+                },
+                connector=aiohttp.TCPConnector(limit=self.max_in_flight, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=10),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        return self._session
+
+    async def _request(self, method: str, path: str, **kwargs) -> dict:
+        """JSON body of a successful reply; HTTP 4xx/5xx raise RupeezyAPIError."""
+        session = await self._get_session()
+        async with self._semaphore:
+            async with session.request(method, f"{self.base_url}{path}", **kwargs) as resp:
+                payload = await resp.json(content_type=None)
+                if resp.status >= 400:
+                    logging.error(f"❌ Rupeezy {method} {path} failed ({resp.status}): {payload}")
+                    raise RupeezyAPIError(method, path, resp.status, payload)
+                return payload
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def __aenter__(self):
+        await self._get_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    # --------------------------------------------------------------
+    # Helpers
+    # --------------------------------------------------------------
+    @staticmethod
+    def _instrument(symbol: str) -> dict:
+        info = lookup(symbol)
+        if info is None:
+            raise ValueError(f"Unknown instrument: {symbol}")
+        return info
+
+    async def get_ltps(self, symbols) -> dict:
+        """LTPs for many symbols in a single quote request. Returns {symbol: ltp}."""
+        keys = {}
+        for symbol in symbols:
+            info = self._instrument(symbol)
+            keys[f"{info['exchange']}-{info['token']}"] = symbol
+        payload = await self._request("GET", "/data/quotes",
+                                      params=[("q", k) for k in keys] + [("mode", "ltp")])
+        data = payload.get("data", {}) or {}
+        return {
+            keys[k]: float(v.get("last_trade_price", 0) or 0)
+            for k, v in data.items()
+            if k in keys and v
+        }
+
+    # --------------------------------------------------------------
+    # AsyncBrokerBase interface
+    # --------------------------------------------------------------
+    async def get_ltp(self, symbol: str) -> float:
+        return (await self.get_ltps([symbol])).get(symbol)
+
+    async def place_order(self, symbol: str, qty: int, order_type: str, price: float = 0.0,
+                          is_amo: bool = False) -> dict:
+        info = self._instrument(symbol)
+        body = {
+            "exchange": info["exchange"],
+            "token": info["token"],
+            "transaction_type": order_type.upper(),
+            "product": self.product,
+            "variety": "RL-MKT" if not price else "RL",
+            "quantity": int(qty),
+            "price": float(price),
+            "trigger_price": 0.0,
+            "disclosed_quantity": 0,
+            "validity": "AMO" if is_amo else "DAY",
+            "validity_days": 1,
+        }
+        response = await self._request("POST", "/trading/orders/regular", json=body)
+        logging.info(f"✅ Order placed for {symbol}: {response}")
+        return response
+
+    async def get_holdings(self) -> dict:
+        payload = await self._request("GET", "/trading/portfolio/holdings")
+        return parse_holdings(payload)
+
+    async def get_margin(self) -> dict:
+        payload = await self._request("GET", "/user/funds")
+        nse = payload.get("nse", payload.get("data", {})) or {}
+        return {
+            "available": float(nse.get("net_available", 0) or 0),
+            "used": float(nse.get("total_utilization", 0) or 0),
+            "raw": payload,
+        }
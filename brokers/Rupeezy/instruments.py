@@ -0,0 +1,51 @@
+# File: brokers/rupeezy/instruments.py
+"""
+Instrument registry built from rupeezy_instruments_list.txt.
+
+The file is tab-separated (token, exchange, symbol, series, security_desc) and
+is loaded once per process; lookups are plain dict hits afterwards.
+"""
+
+import csv
+import os
+from functools import lru_cache
+
+INSTRUMENTS_FILE = os.path.join(os.path.dirname(__file__), "rupeezy_instruments_list.txt")
+
+
+@lru_cache(maxsize=None)
+def load_instruments(path: str = INSTRUMENTS_FILE) -> dict:
+    """Return {SYMBOL: {"token": int, "exchange": str, "series": str}} for every listed instrument."""
+    registry = {}
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        for row in csv.DictReader(f, delimiter="\t"):
+            symbol = (row.get("symbol") or "").strip().upper()
+            token = (row.get("token") or "").strip()
+            if not symbol or not token.isdigit():
+                continue
+            # Prefer the EQ series when a symbol is listed more than once.
+            if symbol in registry and row.get("series", "").strip() != "EQ":
+                continue
+            registry[symbol] = {
+                "token": int(token),
+                "exchange": (row.get("exchange") or "NSE_EQ").strip(),
+                "series": (row.get("series") or "").strip(),
+            }
+    return registry
+
+
+@lru_cache(maxsize=None)
+def max_token(path: str = INSTRUMENTS_FILE) -> int:
+    """Highest token listed in the file (all series), or 0 if none."""
+    highest = 0
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        for row in csv.DictReader(f, delimiter="\t"):
+            token = (row.get("token") or "").strip()
+            if token.isdigit():
+                highest = max(highest, int(token))
+    return highest
+
+
+def lookup(symbol: str):
+    """Registry entry for a symbol, or None if it is not a known instrument."""
+    return load_instruments().get(symbol.strip().upper())
@@ -1,16 +1,18 @@
 # File: brokers/rupeezy/login.py
-import os
 import requests
 import pyotp
 import logging
 
+from config import get_settings
+
 def rupeezy_login():
+    settings = get_settings()
     creds = {
-        "client_code": os.getenv("RUPEEZY_CLIENT_CODE"),
-        "password": os.getenv("RUPEEZY_PASSWORD"),
-        "api_key": os.getenv("RUPEEZY_API_KEY"),
-        "app_id": os.getenv("RUPEEZY_APPLICATION_ID"),
-        "totp_secret": os.getenv("RUPEEZY_TOTP_SECRET"),
+        "client_code": settings.rupeezy_client_code,
+        "password": settings.rupeezy_password,
+        "api_key": settings.rupeezy_api_key,
+        "app_id": settings.rupeezy_application_id,
+        "totp_secret": settings.rupeezy_totp_secret,
     }
 
     # Generate TOTP
@@ -1,9 +1,9 @@
 # brokers/rupeezy/main.py
 
-import os
 import logging
 from datetime import datetime
 
+from config import get_settings
 # Fix import for same-folder login.py
 from brokers.rupeezy.login import rupeezy_login
 
@@ -27,7 +27,7 @@ def main():
     logging.info("=============================================")
     logging.info(f"📈 Rupeezy Broker Launcher | {datetime.now()}")
 
-    strategy = os.getenv("STRATEGY", "auto_buy_logic")
+    strategy = get_settings().strategy
     logging.info(f"📊 Strategy to execute: {strategy}")
 
     logging.info("🔐 Logging in to Rupeezy ...")
@@ -0,0 +1,22 @@
+# File: brokers/rupeezy/portfolio.py
+"""
+Parsers for Rupeezy portfolio payloads, shared by the Vortex SDK callers and
+the aiohttp adapter so both read holdings the same way.
+"""
+
+
+def parse_holdings(payload, holdings: dict = None) -> dict:
+    """
+    Sum a holdings reply into {symbol: qty}.
+
+    Args:
+        payload (dict): Raw holdings response ({"data": [...]}).
+        holdings (dict, optional): Existing map to add into.
+    """
+    holdings = {} if holdings is None else holdings
+    for item in (payload or {}).get("data", []) or []:
+        symbol = item.get("symbol") or item.get("nse", {}).get("symbol")
+        qty = item.get("total_quantity", item.get("quantity", 0)) or 0
+        if symbol:
+            holdings[symbol] = holdings.get(symbol, 0) + int(qty)
+    return holdings
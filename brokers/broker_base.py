@@ -1,5 +1,7 @@
 # brokers/broker_base.py
 
+import asyncio
+import threading
 from abc import ABC, abstractmethod
 
 class BrokerBase(ABC):
@@ -55,3 +57,107 @@ class BrokerBase(ABC):
             dict: Dictionary with margin information like available cash, used margin, etc.
         """
         pass
+
+
+class AsyncBrokerBase(ABC):
+    """
+    Asynchronous counterpart of BrokerBase. Implementations keep a single pooled
+    HTTP session so many quote/order calls can be in flight from one thread.
+    """
+
+    @abstractmethod
+    async def get_ltp(self, symbol: str) -> float:
+        """
+        Get the latest traded price (LTP) of a given symbol.
+
+        Args:
+            symbol (str): The stock or instrument symbol.
+
+        Returns:
+            float: Latest traded price.
+        """
+        pass
+
+    @abstractmethod
+    async def place_order(self, symbol: str, qty: int, order_type: str) -> dict:
+        """
+        Place an order for a stock or instrument.
+
+        Args:
+            symbol (str): The stock or instrument symbol.
+            qty (int): Quantity to buy/sell.
+            order_type (str): "buy" or "sell".
+
+        Returns:
+            dict: Order confirmation or response from the broker.
+        """
+        pass
+
+    @abstractmethod
+    async def get_holdings(self) -> dict:
+        """
+        Retrieve current holdings from the broker account.
+
+        Returns:
+            dict: Dictionary of holdings with symbol as key.
+        """
+        pass
+
+    @abstractmethod
+    async def get_margin(self) -> dict:
+        """
+        Retrieve margin and cash availability from broker.
+
+        Returns:
+            dict: Dictionary with margin information like available cash, used margin, etc.
+        """
+        pass
+
+    async def close(self):
+        """Release network resources (pooled sessions)."""
+        pass
+
+
+class SyncBrokerShim(BrokerBase):
+    """
+    Exposes an AsyncBrokerBase through the synchronous BrokerBase interface.
+
+    A private event loop runs in a daemon thread; each call is scheduled on it
+    and waited for, so existing synchronous strategies keep working while the
+    underlying session stays shared and pooled.
+    """
+
+    def __init__(self, async_broker: AsyncBrokerBase):
+        self.async_broker = async_broker
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="broker-loop", daemon=True)
+        self._thread.start()
+
+    def _call(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def get_ltp(self, symbol: str) -> float:
+        return self._call(self.async_broker.get_ltp(symbol))
+
+    def place_order(self, symbol: str, qty: int, order_type: str) -> dict:
+        return self._call(self.async_broker.place_order(symbol, qty, order_type))
+
+    def get_holdings(self) -> dict:
+        return self._call(self.async_broker.get_holdings())
+
+    def get_margin(self) -> dict:
+        return self._call(self.async_broker.get_margin())
+
+    def __getattr__(self, name):
+        # Forward extra coroutine helpers (e.g. get_ltps) as blocking calls.
+        if name.startswith("_") or name == "async_broker":
+            raise AttributeError(name)
+        attr = getattr(self.async_broker, name)
+        if asyncio.iscoroutinefunction(attr):
+            return lambda *args, **kwargs: self._call(attr(*args, **kwargs))
+        return attr
+
+    def close(self):
+        self._call(self.async_broker.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
@@ -0,0 +1,232 @@
+# brokers/paper_broker.py
+
+"""
+Paper-trading broker with a simulated matching engine.
+
+PaperBroker implements BrokerBase, so any broker-agnostic strategy can run
+against it unchanged. Prices come either from a live tick feed (call
+on_tick for every update) or from a recorded replay (replay / load_replay).
+
+Orders are not filled at submission: each one becomes matchable only after the
+configured latency has passed on the simulated clock, and then fills against
+the next tick at the simulated bid/ask plus slippage. Market orders fill at
+once; limit orders rest until the price crosses them.
+
+Example:
+    broker = PaperBroker(cash=500000, latency=0.05, slippage_bps=2)
+    broker.replay(load_replay("ticks_2025-10-20.csv"))
+"""
+
+import csv
+import itertools
+import threading
+import time
+
+from brokers.broker_base import BrokerBase
+
+OPEN = "OPEN"
+COMPLETE = "COMPLETE"
+REJECTED = "REJECTED"
+CANCELLED = "CANCELLED"
+
+
+def load_replay(path: str):
+    """
+    Stream ticks from a CSV with columns ts,symbol,ltp (ts in epoch seconds).
+
+    Yields:
+        tuple: (ts, symbol, ltp)
+    """
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            yield float(row["ts"]), row["symbol"].strip().upper(), float(row["ltp"])
+
+
+class PaperBroker(BrokerBase):
+    """
+    Simulated broker account.
+
+    Args:
+        cash (float): Starting cash / margin.
+        latency (float): Seconds between submission and the order reaching the book.
+        slippage_bps (float): Adverse slippage applied to every fill, in basis points.
+        spread_bps (float): Simulated bid/ask spread around LTP, in basis points.
+        eligible_stocks (list[dict], optional): Returned by get_eligible_stocks().
+        clock (callable, optional): Time source for live mode; replays use tick time.
+    """
+
+    def __init__(self, cash: float = 1_000_000.0, latency: float = 0.0, slippage_bps: float = 0.0,
+                 spread_bps: float = 0.0, eligible_stocks=None, clock=time.time):
+        self.cash = float(cash)
+        self.latency = float(latency)
+        self.slippage = float(slippage_bps) / 10_000
+        self.half_spread = float(spread_bps) / 20_000
+        self.eligible_stocks = list(eligible_stocks or [])
+        self.clock = clock
+
+        self.ltp = {}            # symbol -> last price
+        self.holdings = {}       # symbol -> qty
+        self.orders = {}         # order_id -> order dict
+        self.resting = {}        # symbol -> [order_id, ...] still OPEN
+        self.fills = []
+        self.now = None          # simulated time; None until the first tick
+        self._ids = itertools.count(1)
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------------
+    # Market data
+    # ------------------------------------------------------------------
+    def on_tick(self, symbol: str, ltp: float, ts: float = None):
+        """Feed one price update and match any resting orders for that symbol."""
+        symbol = symbol.upper()
+        with self._lock:
+            self.now = self.clock() if ts is None else float(ts)
+            self.ltp[symbol] = float(ltp)
+            self._match(symbol)
+
+    def replay(self, ticks):
+        """Feed an iterable of (ts, symbol, ltp) ticks in order. Returns the tick count."""
+        count = 0
+        for ts, symbol, ltp in ticks:
+            self.on_tick(symbol, ltp, ts)
+            count += 1
+        return count
+
+    def _time(self):
+        return self.now if self.now is not None else self.clock()
+
+    # ------------------------------------------------------------------
+    # Matching engine
+    # ------------------------------------------------------------------
+    def _match(self, symbol):
+        ids = self.resting.get(symbol)
+        if not ids:
+            return
+        ltp = self.ltp[symbol]
+        ask = ltp * (1 + self.half_spread)
+        bid = ltp * (1 - self.half_spread)
+        still_open = []
+
+        for order_id in ids:
+            order = self.orders[order_id]
+            if order["status"] != OPEN:
+                continue
+            if order["active_at"] > self.now:
+                still_open.append(order_id)
+                continue
+
+            if order["side"] == "BUY":
+                touch = ask * (1 + self.slippage)
+                crosses = order["limit"] is None or touch <= order["limit"]
+                price = touch if order["limit"] is None else min(touch, order["limit"])
+            else:
+                touch = bid * (1 - self.slippage)
+                crosses = order["limit"] is None or touch >= order["limit"]
+                price = touch if order["limit"] is None else max(touch, order["limit"])
+
+            if crosses:
+                self._fill(order, price)
+            else:
+                still_open.append(order_id)
+
+        if still_open:
+            self.resting[symbol] = still_open
+        else:
+            self.resting.pop(symbol, None)
+
+    def _fill(self, order, price):
+        symbol, qty = order["symbol"], order["qty"]
+        value = price * qty
+
+        if order["side"] == "BUY":
+            if value > self.cash:
+                order.update(status=REJECTED, reason="insufficient funds at fill")
+                return
+            self.cash -= value
+            self.holdings[symbol] = self.holdings.get(symbol, 0) + qty
+        else:
+            held = self.holdings.get(symbol, 0)
+            if held < qty:
+                order.update(status=REJECTED, reason="insufficient holdings at fill")
+                return
+            self.cash += value
+            if held == qty:
+                self.holdings.pop(symbol)
+            else:
+                self.holdings[symbol] = held - qty
+
+        order.update(status=COMPLETE, fill_price=round(price, 4), filled_at=self.now)
+        self.fills.append((order["order_id"], symbol, order["side"], qty, price, self.now))
+
+    # ------------------------------------------------------------------
+    # BrokerBase interface
+    # ------------------------------------------------------------------
+    def get_ltp(self, symbol: str) -> float:
+        return self.ltp.get(symbol.upper())
+
+    def place_order(self, symbol: str, qty: int, order_type: str, price: float = None) -> dict:
+        """
+        Submit a simulated order. `price=None` is a market order, otherwise a limit order.
+
+        Returns:
+            dict: {"status": "success", "data": {"orderId": ...}}, or
+            {"status": "error", "message": ...} without an orderId when rejected,
+            so callers that treat a present orderId as an ack stay correct.
+        """
+        symbol = symbol.upper()
+        side = order_type.upper()
+        if side not in ("BUY", "SELL") or int(qty) <= 0:
+            return {"status": "error", "message": f"invalid order {order_type} x {qty}"}
+
+        with self._lock:
+            order_id = f"PAPER{next(self._ids):08d}"
+            submitted = self._time()
+            order = {
+                "order_id": order_id,
+                "symbol": symbol,
+                "side": side,
+                "qty": int(qty),
+                "limit": None if price is None else float(price),
+                "status": OPEN,
+                "submitted_at": submitted,
+                "active_at": submitted + self.latency,
+            }
+            self.orders[order_id] = order
+
+            # Reject up front what a real broker would reject on margin/holdings.
+            ref_price = order["limit"] or self.ltp.get(symbol)
+            if side == "BUY" and ref_price and ref_price * order["qty"] > self.cash:
+                order.update(status=REJECTED, reason="insufficient funds")
+                return {"status": "error", "message": "insufficient funds"}
+            if side == "SELL" and self.holdings.get(symbol, 0) < order["qty"]:
+                order.update(status=REJECTED, reason="insufficient holdings")
+                return {"status": "error", "message": "insufficient holdings"}
+
+            self.resting.setdefault(symbol, []).append(order_id)
+            if self.latency == 0 and symbol in self.ltp:
+                self._match(symbol)
+
+        return {"status": "success", "data": {"orderId": order_id}}
+
+    def cancel_order(self, order_id: str) -> bool:
+        with self._lock:
+            order = self.orders.get(order_id)
+            if not order or order["status"] != OPEN:
+                return False
+            order["status"] = CANCELLED
+            return True
+
+    def order_status(self, order_id: str) -> dict:
+        return dict(self.orders.get(order_id, {}))
+
+    def get_holdings(self) -> dict:
+        with self._lock:
+            return dict(self.holdings)
+
+    def get_margin(self) -> dict:
+        with self._lock:
+            return {"available": self.cash, "holdings_value": sum(
+                qty * self.ltp.get(sym, 0.0) for sym, qty in self.holdings.items())}
+
+    def get_eligible_stocks(self):
+        return list(self.eligible_stocks)
@@ -0,0 +1,121 @@
+# brokers/position_book.py
+"""
+In-memory position and margin book used for pre-trade checks.
+
+The book is seeded once per run from the broker (holdings, open positions and
+available margin) and is then kept current from our own order acks and fills,
+so every submission can be checked locally instead of discovering a margin or
+duplicate-holding rejection one broker round-trip later.
+"""
+
+import logging
+import threading
+
+
+class PositionBook:
+    """
+    Tracks quantity held per symbol, quantity pending at the broker and the
+    margin still free after reservations for pending orders.
+
+    Args:
+        margin_factor (float, optional): Fraction of order value that must be
+            covered by available margin (1.0 = fully funded, <1.0 for leveraged
+            products like MTF). None or 0 skips the margin rule entirely, since a
+            wrong factor would reject orders the broker accepts on leverage.
+    """
+
+    def __init__(self, margin_factor: float = None):
+        self.margin_factor = float(margin_factor or 0.0)
+        self.holdings = {}
+        self.pending = {}
+        self.available_margin = None
+        self.reserved_margin = 0.0
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------------------
+    # Seeding
+    # --------------------------------------------------------------
+    def seed(self, holdings: dict, available_margin=None):
+        """Reset the book from a broker snapshot ({symbol: qty}, free margin)."""
+        with self._lock:
+            self.holdings = {s.upper(): int(q) for s, q in (holdings or {}).items() if int(q) != 0}
+            self.pending = {}
+            self.reserved_margin = 0.0
+            self.available_margin = None if available_margin is None else float(available_margin)
+        logging.info(f"📚 Position book seeded: {len(self.holdings)} symbols held, "
+                     f"available margin = {self.available_margin}")
+
+    def seed_from_broker(self, broker):
+        """Seed from any BrokerBase implementation (get_holdings / get_margin)."""
+        holdings = broker.get_holdings() or {}
+        margin = broker.get_margin() or {}
+        self.seed(holdings, margin.get("available"))
+
+    # --------------------------------------------------------------
+    # Pre-trade check
+    # --------------------------------------------------------------
+    @property
+    def enforces_margin(self) -> bool:
+        return self.margin_factor > 0
+
+    def free_margin(self):
+        if self.available_margin is None or not self.enforces_margin:
+            return None
+        return self.available_margin - self.reserved_margin
+
+    def check(self, symbol: str, qty: int, price=None, allow_existing: bool = False):
+        """
+        Decide locally whether an order would be accepted.
+
+        Returns:
+            tuple: (ok: bool, reason: str)
+        """
+        symbol = symbol.upper()
+        with self._lock:
+            if not allow_existing:
+                if self.holdings.get(symbol, 0) > 0:
+                    return False, f"already holding {self.holdings[symbol]} {symbol}"
+                if self.pending.get(symbol, 0) > 0:
+                    return False, f"order already pending for {symbol}"
+
+            free = self.free_margin()
+            if free is not None and price:
+                required = float(price) * int(qty) * self.margin_factor
+                if required > free:
+                    return False, f"insufficient margin: need {required:.2f}, free {free:.2f}"
+
+        return True, ""
+
+    # --------------------------------------------------------------
+    # Incremental updates
+    # --------------------------------------------------------------
+    def on_ack(self, symbol: str, qty: int, price=None):
+        """Order accepted by the broker: mark quantity pending and reserve margin."""
+        symbol = symbol.upper()
+        with self._lock:
+            self.pending[symbol] = self.pending.get(symbol, 0) + int(qty)
+            if price and self.enforces_margin:
+                self.reserved_margin += float(price) * int(qty) * self.margin_factor
+
+    def on_fill(self, symbol: str, qty: int, price=None, reserved_price=None):
+        """Order filled: move quantity from pending to held and settle the margin."""
+        symbol = symbol.upper()
+        with self._lock:
+            self._release(symbol, qty, reserved_price)
+            self.holdings[symbol] = self.holdings.get(symbol, 0) + int(qty)
+            if price and self.available_margin is not None and self.enforces_margin:
+                self.available_margin -= float(price) * int(qty) * self.margin_factor
+
+    def on_reject(self, symbol: str, qty: int, reserved_price=None):
+        """Order rejected / cancelled: release the pending quantity and margin."""
+        with self._lock:
+            self._release(symbol.upper(), qty, reserved_price)
+
+    def _release(self, symbol, qty, reserved_price):
+        left = self.pending.get(symbol, 0) - int(qty)
+        if left > 0:
+            self.pending[symbol] = left
+        else:
+            self.pending.pop(symbol, None)
+        if reserved_price:
+            self.reserved_margin = max(0.0, self.reserved_margin - float(reserved_price) * int(qty) * self.margin_factor)
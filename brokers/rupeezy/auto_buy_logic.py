@@ -1,8 +1,10 @@
-import csv
 import os
 import logging
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from .orders import place_order
+from .state_store import StockStateStore
+from storage.stock_state import states_from_csv
+from config import get_settings
 logger = logging.getLogger("AutoBuy")
 logging.basicConfig(
     level=logging.INFO,
@@ -10,51 +12,46 @@ logging.basicConfig(
     handlers=[logging.StreamHandler()]
 )
 DATA_FILE = os.path.join(os.path.dirname(__file__), "data", "eligible_stocks.csv")
-def read_eligible_stocks():
-    if not os.path.exists(DATA_FILE):
-        logger.error(f"CSV file not found: {DATA_FILE}")
-        return []
-    with open(DATA_FILE, "r") as f:
-        reader = csv.DictReader(f)
-        return list(reader)
-def write_updated_stocks(rows):
-    with open(DATA_FILE, "w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=rows[0].keys())
-        writer.writeheader()
-        writer.writerows(rows)
-def run():
-    logger.info("?? Starting Auto Buy Logic...")
-    stocks = read_eligible_stocks()
-    if not stocks:
-        logger.warning("No eligible stocks to process.")
-        return
-    updated_stocks = []
-    for stock in stocks:
-        symbol = stock.get("InstrumentName")
-        status = stock.get("EligibilityStatus", "")
-        base_value = float(stock.get("BaseValue", 0) or 0)
-        quantity = int(stock.get("DefaultQuantity", 0) or 0)
-        processed = stock.get("FirstDayProcessed", "False").lower() == "true"
+DB_FILE = os.path.join(os.path.dirname(__file__), "data", "eligible_stocks.db")
+def select_orders(stocks):
+    orders = []
+    for stock in states_from_csv(stocks):
+        symbol = stock.instrument
+        status = stock.status
+        quantity = stock.default_qty
+        processed = stock.first_day_processed
         if status != "Eligible":
             logger.info(f"? Skipping {symbol} (Status: {status})")
-            updated_stocks.append(stock)
             continue
         if processed:
             logger.info(f"? Already processed: {symbol}")
-            updated_stocks.append(stock)
             continue
         if quantity <= 0:
             logger.warning(f"?? Quantity 0 for {symbol}, skipping.")
-            updated_stocks.append(stock)
             continue
-        try:
-            price = place_order(symbol, quantity)
-            logger.info(f"?? Order placed: {symbol} | Qty: {quantity} | Price: {price}")
-            if base_value <= 0:
-                stock["BaseValue"] = price
-            stock["FirstDayProcessed"] = "True"
-        except Exception as e:
-            logger.error(f"? Failed to place order for {symbol}: {str(e)}")
-        updated_stocks.append(stock)
-    write_updated_stocks(updated_stocks)
+        orders.append((symbol, quantity))
+    return orders
+def run():
+    logger.info("?? Starting Auto Buy Logic...")
+    store = StockStateStore(DB_FILE, DATA_FILE)
+    if not store.sync_from_csv():
+        logger.warning("No eligible stocks to process.")
+        return
+    orders = select_orders(store.rows())
+    if not orders:
+        logger.warning("No eligible stocks to process.")
+        return
+    # Orders go out concurrently; each completion is committed on its own,
+    # so a crash mid-run keeps every order that already went through.
+    with ThreadPoolExecutor(max_workers=max(1, min(get_settings().offline_order_workers, len(orders)))) as pool:
+        futures = {pool.submit(place_order, symbol, qty): (symbol, qty) for symbol, qty in orders}
+        for future in as_completed(futures):
+            symbol, quantity = futures[future]
+            try:
+                price = future.result()
+                logger.info(f"?? Order placed: {symbol} | Qty: {quantity} | Price: {price}")
+                store.mark_processed(symbol, price)
+            except Exception as e:
+                logger.error(f"? Failed to place order for {symbol}: {str(e)}")
+    store.export_csv()
     logger.info("? Auto Buy Logic completed.")
@@ -0,0 +1,124 @@
+import csv
+import os
+import sqlite3
+import tempfile
+import threading
+import logging
+logger = logging.getLogger("AutoBuy")
+FIELDS = ["InstrumentName", "EligibilityStatus", "DefaultQuantity", "BaseValue", "FirstDayProcessed"]
+
+
+class StockStateStore:
+    """
+    SQLite (WAL) state store for the offline CSV path.
+
+    The CSV stays the human-editable source: it is merged in whenever it changes
+    on disk, every completed order is committed to SQLite as its own
+    transaction, and the CSV is regenerated through a temp-file swap so a crash
+    never leaves it half written.
+
+    Because SQLite may be ahead of the CSV (a crash between mark_processed and
+    export_csv), an import never downgrades a row: FirstDayProcessed='True' and
+    a positive BaseValue already in SQLite survive any CSV edit.
+    """
+
+    def __init__(self, db_path, csv_path):
+        self.db_path = db_path
+        self.csv_path = csv_path
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS stocks ("
+                "InstrumentName TEXT PRIMARY KEY, EligibilityStatus TEXT, DefaultQuantity TEXT, "
+                "BaseValue TEXT, FirstDayProcessed TEXT, row_order INTEGER)"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    def _conn(self):
+        """One connection per thread; WAL lets readers and the committing writer overlap."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def _get_meta(self, key):
+        row = self._conn().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def _set_meta(self, conn, key, value):
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def sync_from_csv(self):
+        """Merge the CSV into SQLite if it was edited after our last import/export."""
+        if not os.path.exists(self.csv_path):
+            logger.error(f"CSV file not found: {self.csv_path}")
+            return False
+        mtime = os.path.getmtime(self.csv_path)
+        synced = self._get_meta("csv_mtime")
+        if synced is not None and float(synced) >= mtime:
+            return True
+        with open(self.csv_path, "r", encoding="utf-8-sig", newline="") as f:
+            rows = [
+                tuple(row.get(k, "") for k in FIELDS) + (i,)
+                for i, row in enumerate(csv.DictReader(f))
+                if row.get("InstrumentName")
+            ]
+        with self._conn() as conn:
+            conn.executemany(
+                "INSERT INTO stocks VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(InstrumentName) DO UPDATE SET "
+                "EligibilityStatus = excluded.EligibilityStatus, "
+                "DefaultQuantity = excluded.DefaultQuantity, "
+                "row_order = excluded.row_order, "
+                "FirstDayProcessed = CASE WHEN stocks.FirstDayProcessed = 'True' "
+                "THEN 'True' ELSE excluded.FirstDayProcessed END, "
+                "BaseValue = CASE WHEN CAST(COALESCE(NULLIF(stocks.BaseValue, ''), '0') AS REAL) > 0 "
+                "THEN stocks.BaseValue ELSE excluded.BaseValue END",
+                rows,
+            )
+            # Rows deleted from the CSV are dropped; they can no longer be bought.
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS csv_names (name TEXT PRIMARY KEY)")
+            conn.execute("DELETE FROM csv_names")
+            conn.executemany("INSERT OR IGNORE INTO csv_names VALUES (?)", [(r[0],) for r in rows])
+            conn.execute("DELETE FROM stocks WHERE InstrumentName NOT IN (SELECT name FROM csv_names)")
+            self._set_meta(conn, "csv_mtime", mtime)
+        logger.info(f"Merged {len(rows)} rows from {self.csv_path}")
+        return True
+
+    def rows(self):
+        cur = self._conn().execute(f"SELECT {', '.join(FIELDS)} FROM stocks ORDER BY row_order")
+        return [dict(r) for r in cur]
+
+    def mark_processed(self, symbol, price):
+        """Atomically record a completed first-day order (BaseValue only set if unset)."""
+        with self._conn() as conn:
+            conn.execute(
+                "UPDATE stocks SET FirstDayProcessed = 'True', "
+                "BaseValue = CASE WHEN CAST(COALESCE(NULLIF(BaseValue, ''), '0') AS REAL) <= 0 "
+                "THEN ? ELSE BaseValue END WHERE InstrumentName = ?",
+                (str(price), symbol),
+            )
+
+    def export_csv(self):
+        """Rewrite the CSV from SQLite via temp file + os.replace."""
+        rows = self.rows()
+        directory = os.path.dirname(self.csv_path) or "."
+        fd, tmp_path = tempfile.mkstemp(prefix=".eligible_stocks.", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=FIELDS)
+                writer.writeheader()
+                writer.writerows(rows)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.csv_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        with self._conn() as conn:
+            self._set_meta(conn, "csv_mtime", os.path.getmtime(self.csv_path))
@@ -0,0 +1,9 @@
+from .settings import (
+    ConfigError,
+    Settings,
+    get_settings,
+    load_settings,
+    on_reload,
+    reload_settings,
+    watch_settings,
+)
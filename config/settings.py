@@ -0,0 +1,326 @@
+# config/settings.py
+"""
+Central, typed configuration for DSG.
+
+Settings are resolved once per process, in increasing priority:
+
+    1. defaults declared on the Settings dataclass
+    2. the legacy run_mode.txt switch (PAPER / DRY_RUN / OFF -> dry_run)
+    3. an optional JSON file (config/settings.json, or the path in DSG_CONFIG)
+    4. environment variables (names listed in ENV_VARS)
+
+and validated before they are published. get_settings() hands out the current
+frozen Settings object; a reload swaps it atomically, so readers always see a
+complete, valid configuration.
+
+A long-running process can call watch_settings() to poll the JSON file and
+pick up new strategy parameters, rate limits or screener conditions without
+a restart. Callbacks registered with on_reload() run after each successful reload.
+"""
+
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass, fields, replace
+
+CONFIG_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CONFIG_FILE = os.path.join(CONFIG_DIR, "settings.json")
+RUN_MODE_FILE = os.path.join(os.path.dirname(CONFIG_DIR), "run_mode.txt")
+# run_mode.txt values that mean "no live orders"
+PAPER_RUN_MODES = ("PAPER", "DRY_RUN", "DRYRUN", "OFF")
+
+
+@dataclass(frozen=True)
+class Settings:
+    # Orchestration
+    broker: str = "rupeezy"
+    strategy: str = "auto_buy_logic"
+    targets: str = ""
+    run_broker_main: bool = False
+    dry_run: bool = False
+    paper_cash: float = 1_000_000.0
+    paper_latency: float = 0.0
+    paper_slippage_bps: float = 0.0
+    paper_spread_bps: float = 0.0
+    run_window: str = "trading_day"
+    force_run: bool = False
+    schedule_every_minutes: int = 0
+
+    # Rupeezy credentials
+    rupeezy_client_code: str = ""
+    rupeezy_password: str = ""
+    rupeezy_api_key: str = ""
+    rupeezy_application_id: str = ""
+    rupeezy_totp_secret: str = ""
+    rupeezy_access_token: str = ""
+
+    # AWS / DynamoDB
+    aws_region: str = "ap-south-1"
+    stock_table: str = "StockEligibility"
+
+    # Screener
+    chartink_condition: str = (
+        "( {166311} ( latest rsi(65) < latest ema(rsi(65),35) "
+        "or weekly rsi(65) < weekly ema(rsi(65),35) ) )"
+    )
+    eligibility_snapshot_path: str = "eligibility_snapshot.json"
+    full_resync_hours: float = 24.0
+    force_full_sync: bool = False
+
+    # Order flow
+    order_journal_path: str = "order_journal.jsonl"
+    mtf_margin_factor: float = 0.0  # 0 = no local margin check
+    staging_mode: str = ""
+    staging_workers: int = 16
+    open_burst_orders: int = 10  # orders released at once at the open before broker_rate_limit applies
+    averaging_batch_workers: int = 8
+    offline_order_workers: int = 8
+
+    # Broker API throttling (0 disables)
+    broker_rate_limit: float = 10.0
+    broker_rate_burst: int = 10
+    rupeezy_max_in_flight: int = 100
+
+    # Market data feed
+    rupeezy_token_max_age: int = 6 * 3600
+    rupeezy_ws_max_tokens: int = 1000
+    rupeezy_ws_stale_after: float = 5.0
+    rupeezy_ws_instruments: str = "NSE_EQ:26000"
+    rupeezy_tick_bus: str = ""  # shared-memory tick bus name; empty = don't publish
+
+    @property
+    def journal_path(self) -> str:
+        """Order journal in use; dry runs get a separate *_paper journal so they
+        never block live client order IDs."""
+        if not self.dry_run:
+            return self.order_journal_path
+        root, ext = os.path.splitext(self.order_journal_path)
+        return f"{root}_paper{ext or '.jsonl'}"
+
+
+# Environment variable for each setting (existing names are kept as-is)
+ENV_VARS = {
+    "broker": "BROKER",
+    "strategy": "STRATEGY",
+    "targets": "TARGETS",
+    "run_broker_main": "RUN_BROKER_MAIN",
+    "dry_run": "DRY_RUN",
+    "paper_cash": "PAPER_CASH",
+    "paper_latency": "PAPER_LATENCY",
+    "paper_slippage_bps": "PAPER_SLIPPAGE_BPS",
+    "paper_spread_bps": "PAPER_SPREAD_BPS",
+    "run_window": "RUN_WINDOW",
+    "force_run": "FORCE_RUN",
+    "schedule_every_minutes": "SCHEDULE_EVERY_MINUTES",
+    "rupeezy_client_code": "RUPEEZY_CLIENT_CODE",
+    "rupeezy_password": "RUPEEZY_PASSWORD",
+    "rupeezy_api_key": "RUPEEZY_API_KEY",
+    "rupeezy_application_id": "RUPEEZY_APPLICATION_ID",
+    "rupeezy_totp_secret": "RUPEEZY_TOTP_SECRET",
+    "rupeezy_access_token": "RUPEEZY_ACCESS_TOKEN",
+    "aws_region": "AWS_DEFAULT_REGION",
+    "stock_table": "STOCK_TABLE",
+    "chartink_condition": "CHARTINK_CONDITION",
+    "eligibility_snapshot_path": "ELIGIBILITY_SNAPSHOT_PATH",
+    "full_resync_hours": "FULL_RESYNC_HOURS",
+    "force_full_sync": "FORCE_FULL_SYNC",
+    "order_journal_path": "ORDER_JOURNAL_PATH",
+    "mtf_margin_factor": "MTF_MARGIN_FACTOR",
+    "staging_mode": "STAGING_MODE",
+    "staging_workers": "STAGING_WORKERS",
+    "open_burst_orders": "OPEN_BURST_ORDERS",
+    "averaging_batch_workers": "AVERAGING_BATCH_WORKERS",
+    "offline_order_workers": "OFFLINE_ORDER_WORKERS",
+    "broker_rate_limit": "BROKER_RATE_LIMIT",
+    "broker_rate_burst": "BROKER_RATE_BURST",
+    "rupeezy_max_in_flight": "RUPEEZY_MAX_IN_FLIGHT",
+    "rupeezy_token_max_age": "RUPEEZY_TOKEN_MAX_AGE",
+    "rupeezy_ws_max_tokens": "RUPEEZY_WS_MAX_TOKENS",
+    "rupeezy_ws_stale_after": "RUPEEZY_WS_STALE_AFTER",
+    "rupeezy_ws_instruments": "RUPEEZY_WS_INSTRUMENTS",
+    "rupeezy_tick_bus": "RUPEEZY_TICK_BUS",
+}
+
+STAGING_MODES = ("", "amo", "open")
+# Calendar windows for orchestrator.market_calendar.should_run(): "session" =
+# only while the market is open, "trading_day" = any time on a trading day
+# (e.g. post-close AMO staging), "always" = no calendar check
+RUN_WINDOWS = ("session", "trading_day", "always")
+_TYPES = {f.name: f.type for f in fields(Settings)}
+
+
+class ConfigError(ValueError):
+    """Raised when configuration values are missing or invalid."""
+
+
+# ============================================================
+# Loading & validation
+# ============================================================
+def _coerce(name, value):
+    kind = _TYPES[name]
+    kind = {"bool": bool, "int": int, "float": float, "str": str}.get(kind, kind)
+    try:
+        if kind is bool:
+            if isinstance(value, bool):
+                return value
+            return str(value).strip().lower() in ("1", "true", "yes", "on")
+        if kind is str:
+            return str(value).strip()
+        return kind(value)
+    except (TypeError, ValueError):
+        raise ConfigError(f"Invalid value for {name}: {value!r} (expected {kind.__name__})")
+
+
+def _validate(settings: Settings) -> Settings:
+    settings = replace(
+        settings,
+        broker=settings.broker.lower(),
+        strategy=settings.strategy.lower(),
+        staging_mode=settings.staging_mode.lower(),
+        run_window=settings.run_window.lower(),
+    )
+    if settings.run_window not in RUN_WINDOWS:
+        raise ConfigError(f"run_window must be one of {RUN_WINDOWS}, got {settings.run_window!r}")
+    if settings.schedule_every_minutes < 0:
+        raise ConfigError("schedule_every_minutes must be >= 0")
+    if settings.staging_mode not in STAGING_MODES:
+        raise ConfigError(f"staging_mode must be one of {STAGING_MODES}, got {settings.staging_mode!r}")
+    if settings.mtf_margin_factor < 0:
+        raise ConfigError("mtf_margin_factor must be >= 0 (0 disables the margin check)")
+    for name in ("staging_workers", "open_burst_orders", "averaging_batch_workers", "offline_order_workers",
+                 "broker_rate_burst", "rupeezy_max_in_flight", "rupeezy_ws_max_tokens"):
+        if getattr(settings, name) < 1:
+            raise ConfigError(f"{name} must be >= 1")
+    if settings.paper_cash <= 0:
+        raise ConfigError("paper_cash must be > 0")
+    for name in ("paper_latency", "paper_slippage_bps", "paper_spread_bps"):
+        if getattr(settings, name) < 0:
+            raise ConfigError(f"{name} must be >= 0")
+    if settings.broker_rate_limit < 0 or settings.full_resync_hours < 0:
+        raise ConfigError("broker_rate_limit and full_resync_hours must be >= 0")
+    return settings
+
+
+def config_path():
+    return os.getenv("DSG_CONFIG", DEFAULT_CONFIG_FILE)
+
+
+def read_run_mode(path: str = RUN_MODE_FILE):
+    """Contents of run_mode.txt (upper-cased), or None when the file is absent."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read().strip().upper()
+    except OSError:
+        return None
+
+
+def load_settings(path: str = None) -> Settings:
+    """Build and validate Settings from defaults, run_mode.txt, the JSON file and the environment."""
+    path = path or config_path()
+    values = {}
+
+    if read_run_mode() in PAPER_RUN_MODES:
+        values["dry_run"] = True
+
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        unknown = set(data) - set(_TYPES)
+        if unknown:
+            raise ConfigError(f"Unknown settings in {path}: {sorted(unknown)}")
+        values.update({k: _coerce(k, v) for k, v in data.items()})
+
+    for name, env_name in ENV_VARS.items():
+        raw = os.getenv(env_name)
+        if raw is not None and raw != "":
+            values[name] = _coerce(name, raw)
+
+    return _validate(Settings(**values))
+
+
+# ============================================================
+# Process-wide access
+# ============================================================
+_settings = None
+_lock = threading.Lock()
+_callbacks = []
+
+
+def get_settings() -> Settings:
+    """Current settings, loaded on first use."""
+    global _settings
+    if _settings is None:
+        with _lock:
+            if _settings is None:
+                _settings = load_settings()
+    return _settings
+
+
+def reload_settings(path: str = None) -> Settings:
+    """Reload from file + environment. On error the previous settings stay active."""
+    global _settings
+    new = load_settings(path)
+    with _lock:
+        old, _settings = _settings, new
+    if old != new:
+        for callback in list(_callbacks):
+            try:
+                callback(new)
+            except Exception as e:
+                logging.exception(f"💥 Settings reload callback failed: {e}")
+    return new
+
+
+def on_reload(callback):
+    """Register callback(settings) to run after each successful reload."""
+    _callbacks.append(callback)
+    return callback
+
+
+# ============================================================
+# Hot reload
+# ============================================================
+class ConfigWatcher(threading.Thread):
+    """Polls the settings file's mtime and reloads when it changes."""
+
+    def __init__(self, path: str = None, interval: float = 2.0):
+        super().__init__(name="config-watcher", daemon=True)
+        self.path = path or config_path()
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._mtime = self._current_mtime()
+
+    def _current_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime
+        except OSError:
+            return None
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            mtime = self._current_mtime()
+            if mtime == self._mtime:
+                continue
+            self._mtime = mtime
+            try:
+                reload_settings(self.path)
+                logging.info(f"🔧 Reloaded settings from {self.path}")
+            except Exception as e:
+                logging.error(f"❌ Ignoring invalid settings change in {self.path}: {e}")
+
+    def stop(self):
+        self._stop_event.set()
+
+
+_watcher = None
+
+
+def watch_settings(path: str = None, interval: float = 2.0) -> ConfigWatcher:
+    """Start (once) a background watcher for the settings file."""
+    global _watcher
+    if _watcher is None:
+        get_settings()
+        _watcher = ConfigWatcher(path, interval)
+        _watcher.start()
+    return _watcher
@@ -1,6 +1,7 @@
 ﻿# File: D:\DSG\main.py
 import os
 import importlib.util
+from config import get_settings
 def load_and_run_broker_main(broker_name):
     main_path = os.path.join("brokers", broker_name, "main.py")
     if not os.path.exists(main_path):
@@ -15,9 +16,10 @@ def load_and_run_broker_main(broker_name):
     except Exception as e:
         print(f"❌ Failed to run broker main: {e}")
 if __name__ == "__main__":
-    broker = os.getenv("BROKER")
-    strategy = os.getenv("STRATEGY")
-    run_broker_main = os.getenv("RUN_BROKER_MAIN", "false").lower() == "true"
+    settings = get_settings()
+    broker = settings.broker
+    strategy = settings.strategy
+    run_broker_main = settings.run_broker_main
     print(f"📦 Selected Broker: {broker}")
     print(f"📈 Selected Strategy: {strategy}")
     print(f"⚙️  Run Broker Main: {run_broker_main}")
@@ -0,0 +1,388 @@
+# orchestrator/log_analytics.py
+"""
+Streaming analytics over orchestrator logs.
+
+Reads logs/trade_run_*.log (and JSON-lines logs, one object per line) through a
+chain of generators: files -> lines -> records -> runs -> aggregate. Only the
+run currently being parsed and a fixed set of counters are held in memory, so
+weeks of history, including the 9,000+ line re-entry runs, are summarised
+without loading any file whole.
+
+Usage:
+    python -m orchestrator.log_analytics                  # logs/trade_run_*.log + logs/*.jsonl
+    python -m orchestrator.log_analytics logs/old/*.log --since 2025-10-01 --top 20
+    python -m orchestrator.log_analytics --json           # machine-readable report
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+from bisect import bisect_left
+from collections import Counter, namedtuple
+from datetime import datetime
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_PATTERNS = (
+    os.path.join(ROOT_DIR, "logs", "trade_run_*.log"),
+    os.path.join(ROOT_DIR, "logs", "*.jsonl"),
+)
+
+# "2025-10-20 17:03:15,264 - INFO - message" (format used by trade_controller.setup_logging)
+LINE_RE = re.compile(
+    r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}),(\d{3}) - ([A-Z]+) - (.*)$"
+)
+# Instrument names mentioned in strategy warnings/errors, e.g.
+# "Failed to place order for GOLDBEES", "Skipping M&M: no Token on the row"
+SYMBOL_RE = re.compile(r"\b(?:for|Skipping|locally:)\s+([A-Z0-9][A-Z0-9&_.-]*[A-Z][A-Z0-9&_.-]*)(?=[\s:(,]|$)")
+
+RUN_BANNER = "DSG Trading Orchestrator"
+RUN_COMPLETE = "Orchestration complete"
+
+# Ordered phase markers: a phase lasts from its marker to the next marker (or the run's end).
+PHASES = (
+    ("startup", RUN_BANNER),
+    ("broker_lookup", "Launching trading workflow"),
+    ("broker_exec", "Found broker module"),
+    ("teardown", RUN_COMPLETE),
+)
+
+# Upper bounds (seconds) of the fixed latency buckets used for percentiles
+BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60, 120, 300, 900, 3600, float("inf"))
+
+Record = namedtuple("Record", "ts level message source symbol")
+
+
+# ============================================================
+# 1️⃣ Sources
+# ============================================================
+def iter_files(patterns=DEFAULT_PATTERNS):
+    """Yield matching log paths in name order (trade_run_YYYYMMDD_HHMMSS sorts chronologically)."""
+    seen = set()
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern)):
+            if path not in seen:
+                seen.add(path)
+                yield path
+
+
+def iter_lines(paths):
+    """Yield (path, line) lazily, one line at a time."""
+    for path in paths:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                yield path, line.rstrip("\n")
+
+
+# ============================================================
+# 2️⃣ Parsing
+# ============================================================
+def _parse_json(line):
+    try:
+        data = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    raw_ts = data.get("ts") or data.get("time") or data.get("asctime") or data.get("timestamp")
+    if isinstance(raw_ts, (int, float)):
+        ts = datetime.fromtimestamp(raw_ts)
+    else:
+        try:
+            ts = datetime.fromisoformat(str(raw_ts).replace(",", ".").replace("Z", ""))
+        except ValueError:
+            return None
+    if ts.tzinfo is not None:
+        ts = ts.replace(tzinfo=None)
+    level = str(data.get("level") or data.get("levelname") or "INFO").upper()
+    message = str(data.get("message") or data.get("msg") or "")
+    return ts, level, message, data.get("symbol")
+
+
+def parse_records(lines):
+    """
+    Turn (path, line) pairs into Records.
+
+    Continuation lines (tracebacks, wrapped messages) carry no timestamp and
+    are dropped; the ERROR line that preceded them is what gets counted.
+    """
+    for path, line in lines:
+        m = LINE_RE.match(line)
+        if m:
+            ts = datetime.strptime(m.group(1), "%Y-%m-%d %H:%M:%S").replace(
+                microsecond=int(m.group(2)) * 1000)
+            level, message, symbol = m.group(3), m.group(4), None
+        elif line.startswith("{"):
+            parsed = _parse_json(line)
+            if parsed is None:
+                continue
+            ts, level, message, symbol = parsed
+        else:
+            continue
+
+        if symbol is None and level in ("WARNING", "ERROR", "CRITICAL"):
+            sm = SYMBOL_RE.search(message)
+            symbol = sm.group(1) if sm else None
+        yield Record(ts, level, message, path, symbol)
+
+
+def since(records, start: datetime):
+    """Drop records before `start`."""
+    for r in records:
+        if r.ts >= start:
+            yield r
+
+
+# ============================================================
+# 3️⃣ Runs
+# ============================================================
+class RunSummary:
+    """Counters for one orchestrator run; never stores the records themselves."""
+
+    __slots__ = ("source", "start", "end", "lines", "levels", "reentries",
+                 "completed", "phases", "_phase", "_phase_start", "symbol_failures")
+
+    def __init__(self, record):
+        self.source = record.source
+        self.start = self.end = record.ts
+        self.lines = 0
+        self.levels = Counter()
+        self.reentries = 0
+        self.completed = False
+        self.phases = {}
+        self._phase = None
+        self._phase_start = None
+        self.symbol_failures = Counter()
+
+    @property
+    def duration(self) -> float:
+        return (self.end - self.start).total_seconds()
+
+    @property
+    def errors(self) -> int:
+        return self.levels["ERROR"] + self.levels["CRITICAL"]
+
+    def _enter_phase(self, name, ts):
+        self._close_phase(ts)
+        self._phase, self._phase_start = name, ts
+
+    def _close_phase(self, ts):
+        if self._phase is not None:
+            elapsed = (ts - self._phase_start).total_seconds()
+            self.phases[self._phase] = self.phases.get(self._phase, 0.0) + elapsed
+            self._phase = None
+
+    def add(self, record):
+        self.end = record.ts
+        self.lines += 1
+        self.levels[record.level] += 1
+        if record.symbol and record.level in ("ERROR", "CRITICAL"):
+            self.symbol_failures[record.symbol] += 1
+        for name, marker in PHASES:
+            if marker in record.message:
+                # Repeated banners/lookups inside one run are the re-entry pattern
+                # (broker main.py re-executing the orchestrator); time stays in the
+                # phase already open instead of restarting it.
+                seen = name == self._phase or name in self.phases
+                if name == "startup" and seen:
+                    self.reentries += 1
+                elif not seen:
+                    self._enter_phase(name, record.ts)
+                if name == "teardown":
+                    self.completed = True
+                break
+
+    def finish(self):
+        self._close_phase(self.end)
+        return self
+
+
+def iter_runs(records):
+    """
+    Group records into runs. A run ends when the file changes, or when a new
+    banner appears after the previous run logged "Orchestration complete".
+    """
+    run = None
+    for record in records:
+        starts = RUN_BANNER in record.message
+        if run is not None and (record.source != run.source or (starts and run.completed)):
+            yield run.finish()
+            run = None
+        if run is None:
+            run = RunSummary(record)
+        run.add(record)
+    if run is not None:
+        yield run.finish()
+
+
+# ============================================================
+# 4️⃣ Aggregation
+# ============================================================
+class Histogram:
+    """Fixed-bucket latency histogram: constant memory, approximate percentiles."""
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.n = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value: float):
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.n += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, q: float):
+        """Upper bound of the bucket holding the q-th percentile (capped at the observed max)."""
+        if not self.n:
+            return None
+        rank = q * self.n
+        seen = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self):
+        if not self.n:
+            return {"count": 0}
+        return {
+            "count": self.n,
+            "mean": round(self.total / self.n, 3),
+            "min": round(self.min, 3),
+            "p50": round(self.percentile(0.5), 3),
+            "p95": round(self.percentile(0.95), 3),
+            "max": round(self.max, 3),
+        }
+
+
+class Report:
+    """Cross-run aggregate built one RunSummary at a time."""
+
+    def __init__(self):
+        self.runs = 0
+        self.completed = 0
+        self.runs_with_errors = 0
+        self.runs_with_reentry = 0
+        self.reentries = 0
+        self.lines = 0
+        self.levels = Counter()
+        self.duration = Histogram()
+        self.phases = {name: Histogram() for name, _ in PHASES}
+        self.symbol_failures = Counter()
+        self.per_day = {}
+        self.first = None
+        self.last = None
+
+    def add(self, run: RunSummary):
+        self.runs += 1
+        self.completed += run.completed
+        self.runs_with_errors += run.errors > 0
+        self.runs_with_reentry += run.reentries > 0
+        self.reentries += run.reentries
+        self.lines += run.lines
+        self.levels.update(run.levels)
+        self.duration.add(run.duration)
+        for name, seconds in run.phases.items():
+            self.phases[name].add(seconds)
+        self.symbol_failures.update(run.symbol_failures)
+
+        day = self.per_day.setdefault(run.start.date().isoformat(), [0, 0, 0])
+        day[0] += 1
+        day[1] += run.errors > 0
+        day[2] += run.reentries
+        self.first = run.start if self.first is None else min(self.first, run.start)
+        self.last = run.end if self.last is None else max(self.last, run.end)
+
+    def to_dict(self, top: int = 10):
+        return {
+            "period": [self.first.isoformat() if self.first else None,
+                       self.last.isoformat() if self.last else None],
+            "runs": self.runs,
+            "completed": self.completed,
+            "runs_with_errors": self.runs_with_errors,
+            "error_rate": round(self.runs_with_errors / self.runs, 4) if self.runs else 0.0,
+            "runs_with_reentry": self.runs_with_reentry,
+            "reentries": self.reentries,
+            "lines": self.lines,
+            "levels": dict(self.levels),
+            "run_seconds": self.duration.to_dict(),
+            "phase_seconds": {k: v.to_dict() for k, v in self.phases.items()},
+            "symbol_failures": dict(self.symbol_failures.most_common(top)),
+            "per_day": {d: {"runs": r, "failed_runs": f, "reentries": e}
+                        for d, (r, f, e) in sorted(self.per_day.items())},
+        }
+
+
+def analyze(patterns=DEFAULT_PATTERNS, start: datetime = None) -> Report:
+    """Run the full pipeline and return the aggregate report."""
+    records = parse_records(iter_lines(iter_files(patterns)))
+    if start is not None:
+        records = since(records, start)
+    report = Report()
+    for run in iter_runs(records):
+        report.add(run)
+    return report
+
+
+# ============================================================
+# 5️⃣ CLI
+# ============================================================
+def _fmt_stats(stats):
+    if not stats.get("count"):
+        return "-"
+    return (f"n={stats['count']:<5} mean={stats['mean']:.3f}s  p50={stats['p50']:.3f}s  "
+            f"p95={stats['p95']:.3f}s  max={stats['max']:.3f}s")
+
+
+def print_report(data):
+    print("=" * 60)
+    print(f"📊 DSG log analytics | {data['period'][0]} → {data['period'][1]}")
+    print("=" * 60)
+    print(f"🧭 Runs             : {data['runs']} ({data['completed']} completed)")
+    print(f"❌ Runs with errors : {data['runs_with_errors']} (error rate {data['error_rate']:.1%})")
+    print(f"🔁 Re-entry         : {data['runs_with_reentry']} runs, {data['reentries']} re-entries")
+    print(f"📄 Log lines        : {data['lines']}  {data['levels']}")
+    print(f"⏱ Run duration     : {_fmt_stats(data['run_seconds'])}")
+    for name, stats in data["phase_seconds"].items():
+        print(f"   - {name:<14}: {_fmt_stats(stats)}")
+    if data["symbol_failures"]:
+        print("🚫 Failures per symbol:")
+        for symbol, count in data["symbol_failures"].items():
+            print(f"   - {symbol:<14}: {count}")
+    print("📅 Per day:")
+    for day, row in data["per_day"].items():
+        print(f"   - {day}: {row['runs']} runs, {row['failed_runs']} failed, {row['reentries']} re-entries")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarise DSG orchestrator logs.")
+    parser.add_argument("paths", nargs="*", help="Log files or glob patterns (default: logs/trade_run_*.log, logs/*.jsonl)")
+    parser.add_argument("--since", help="Only include records on/after YYYY-MM-DD")
+    parser.add_argument("--top", type=int, default=10, help="Symbols to list in the failure table")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    start = datetime.strptime(args.since, "%Y-%m-%d") if args.since else None
+    report = analyze(args.paths or DEFAULT_PATTERNS, start)
+    data = report.to_dict(top=args.top)
+    if args.json:
+        json.dump(data, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    else:
+        print_report(data)
+    return 0 if report.runs else 1
+
+
+if __name__ == "__main__":
+    try:
+        sys.stdout.reconfigure(encoding="utf-8")
+    except Exception:
+        pass
+    sys.exit(main())
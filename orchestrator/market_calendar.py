@@ -0,0 +1,181 @@
+# orchestrator/market_calendar.py
+"""
+NSE trading calendar and market-hours checks.
+
+The workflows fire on plain crons, so without a guard every run pays for
+startup, login and a DynamoDB scan on weekends, exchange holidays and outside
+market hours. The orchestrator calls should_run() before any of that work,
+and the in-process scheduler uses next_run() to sleep straight to the next
+tradable slot instead of waking up just to exit again.
+
+Holidays come from config/nse_holidays.json (one list of ISO dates per
+year); update it when NSE publishes the next year's circular. Years missing
+from the file fall back to weekday-only checks with a warning.
+"""
+
+import json
+import logging
+import os
+import time
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+import pytz
+
+from config.settings import RUN_WINDOWS
+
+IST = pytz.timezone("Asia/Kolkata")
+SESSION_OPEN = (9, 15)
+SESSION_CLOSE = (15, 30)
+
+HOLIDAY_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config", "nse_holidays.json"
+)
+
+
+# ============================================================
+# Holidays
+# ============================================================
+@lru_cache(maxsize=1)
+def load_holidays(path: str = HOLIDAY_FILE) -> dict:
+    """Return {year: frozenset(date)} from the bundled holiday file."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        logging.warning(f"⚠️ Holiday file not found: {path}. Only weekends will be skipped.")
+        return {}
+    return {
+        int(year): frozenset(date.fromisoformat(d) for d in days)
+        for year, days in data.items()
+    }
+
+
+_warned_years = set()
+
+
+def is_holiday(day: date) -> bool:
+    holidays = load_holidays()
+    if day.year not in holidays:
+        if day.year not in _warned_years:
+            _warned_years.add(day.year)
+            logging.warning(f"⚠️ No NSE holiday list for {day.year}; treating all weekdays as trading days.")
+        return False
+    return day in holidays[day.year]
+
+
+def is_trading_day(day: date) -> bool:
+    return day.weekday() < 5 and not is_holiday(day)
+
+
+def next_trading_day(day: date) -> date:
+    """First trading day strictly after `day`."""
+    day += timedelta(days=1)
+    while not is_trading_day(day):
+        day += timedelta(days=1)
+    return day
+
+
+# ============================================================
+# Session times
+# ============================================================
+def now_ist() -> datetime:
+    return datetime.now(IST)
+
+
+def _to_ist(now: datetime = None) -> datetime:
+    if now is None:
+        return now_ist()
+    if now.tzinfo is None:
+        return IST.localize(now)
+    return now.astimezone(IST)
+
+
+def session_bounds(day: date):
+    """(open, close) as aware IST datetimes for the given day."""
+    open_ = IST.localize(datetime(day.year, day.month, day.day, *SESSION_OPEN))
+    close = IST.localize(datetime(day.year, day.month, day.day, *SESSION_CLOSE))
+    return open_, close
+
+
+def is_session_open(now: datetime = None) -> bool:
+    now = _to_ist(now)
+    if not is_trading_day(now.date()):
+        return False
+    open_, close = session_bounds(now.date())
+    return open_ <= now < close
+
+
+def next_session_open(now: datetime = None) -> datetime:
+    """Next session open at or after `now` (the current open if the market is open)."""
+    now = _to_ist(now)
+    day = now.date()
+    if is_trading_day(day):
+        open_, close = session_bounds(day)
+        if now < close:
+            return open_
+    return session_bounds(next_trading_day(day))[0]
+
+
+# ============================================================
+# Run gating & scheduling
+# ============================================================
+def should_run(window: str = "session", now: datetime = None):
+    """
+    Decide whether a run is worth starting.
+
+    Returns:
+        tuple: (ok, reason)
+    """
+    if window not in RUN_WINDOWS:
+        raise ValueError(f"window must be one of {RUN_WINDOWS}, got {window!r}")
+    now = _to_ist(now)
+    if window == "always":
+        return True, "calendar check disabled"
+    if not is_trading_day(now.date()):
+        kind = "a weekend" if now.weekday() >= 5 else "an exchange holiday"
+        return False, f"{now.date()} is {kind}"
+    if window == "trading_day":
+        return True, "trading day"
+    if is_session_open(now):
+        return True, "market open"
+    return False, f"outside market hours (next open {next_session_open(now):%Y-%m-%d %H:%M} IST)"
+
+
+def next_run(every_minutes: int, window: str = "session", now: datetime = None) -> datetime:
+    """
+    Next run time for an in-process schedule of `every_minutes`, aligned to
+    the session open (09:15, 09:30, ... for 15 minutes) and never outside `window`.
+    """
+    if every_minutes <= 0:
+        raise ValueError("every_minutes must be > 0")
+    now = _to_ist(now)
+    step = timedelta(minutes=every_minutes)
+
+    if window == "always":
+        return now + step
+
+    day = now.date()
+    if window == "trading_day":
+        if is_trading_day(day) and (now + step).date() == day:
+            return now + step
+        return IST.localize(datetime.combine(next_trading_day(day), datetime.min.time()))
+
+    open_ = next_session_open(now)
+    if now < open_:
+        return open_
+    _, close = session_bounds(open_.date())
+    slots = (now - open_) // step + 1
+    candidate = open_ + slots * step
+    if candidate < close:
+        return candidate
+    return session_bounds(next_trading_day(open_.date()))[0]
+
+
+def sleep_until(when: datetime):
+    """Sleep until an aware datetime, re-checking so long sleeps don't drift."""
+    while True:
+        remaining = (when - now_ist()).total_seconds()
+        if remaining <= 0:
+            return
+        time.sleep(min(remaining, 300))
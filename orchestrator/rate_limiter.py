@@ -0,0 +1,69 @@
+# orchestrator/rate_limiter.py
+"""
+Token-bucket rate limiter for broker API calls.
+
+Each orchestrator worker process owns exactly one limiter (see get_rate_limiter),
+so every (broker, account) target is throttled independently and one account
+hitting its limit never slows another down.
+"""
+
+import threading
+import time
+
+from config import get_settings, on_reload
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket.
+
+    Args:
+        rate (float): Tokens added per second.
+        burst (int): Maximum tokens held at once.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int = 1):
+        """Block until `tokens` are available, then consume them."""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Process-wide limiter configured from broker_rate_limit / broker_rate_burst (0 disables)."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            settings = get_settings()
+            _limiter = RateLimiter(rate=settings.broker_rate_limit, burst=settings.broker_rate_burst)
+        return _limiter
+
+
+@on_reload
+def _apply_settings(settings):
+    """Retune the live limiter in place when settings are hot-reloaded."""
+    with _limiter_lock:
+        if _limiter is not None:
+            with _limiter._lock:
+                _limiter.rate = float(settings.broker_rate_limit)
+                _limiter.burst = max(1, int(settings.broker_rate_burst))
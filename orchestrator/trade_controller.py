@@ -1,6 +1,9 @@
 import importlib.util
+import multiprocessing
 import os
+import queue
 import sys
+import time
 import logging
 from datetime import datetime
 
@@ -21,24 +24,41 @@ for p in [ROOT_DIR, BROKER_DIR]:
     if p not in sys.path:
         sys.path.append(p)
 
+from config import get_settings, reload_settings, watch_settings
+from orchestrator.market_calendar import next_run, should_run, sleep_until
+
 # ============================================================
 # Logging
 # ============================================================
-log_file = os.path.join(LOG_DIR, f"trade_run_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler(log_file, encoding="utf-8"),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+log_file = None
+
+
+def setup_logging(suffix: str = ""):
+    """Configure root logging to stdout plus a timestamped file under logs/."""
+    global log_file
+    name = f"trade_run_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    if suffix:
+        name += f"_{suffix}"
+    log_file = os.path.join(LOG_DIR, f"{name}.log")
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        handlers=[
+            logging.FileHandler(log_file, encoding="utf-8"),
+            logging.StreamHandler(sys.stdout)
+        ],
+        force=True,
+    )
 
 # ============================================================
 # Configuration
 # ============================================================
-BROKER = os.getenv("BROKER", "rupeezy").strip().lower()
-STRATEGY = os.getenv("STRATEGY", "auto_buy_logic").strip().lower()
+# Broker, strategy and targets are read from get_settings() at the start of
+# every run, so the scheduler picks up hot-reloaded values.
+#
+# Optional multi-target mode: TARGETS="broker:account:strategy,broker:account:strategy,..."
+# Per-account settings are read from "<ACCOUNT>__<VAR>" env vars (e.g.
+# ACC1__RUPEEZY_ACCESS_TOKEN) and exposed to that target's worker as <VAR>.
 
 # ============================================================
 # Broker Loader (Direct exec fallback)
@@ -86,13 +106,14 @@ def load_broker_module(broker_name: str):
 # ============================================================
 # Trading Flow
 # ============================================================
-def run_trading_flow():
-    logging.info(f"🚀 Launching trading workflow for broker: {BROKER}")
-    module = load_broker_module(BROKER)
+def run_trading_flow(broker_name: str = None) -> bool:
+    broker_name = broker_name or get_settings().broker
+    logging.info(f"🚀 Launching trading workflow for broker: {broker_name}")
+    module = load_broker_module(broker_name)
 
     if not module:
         logging.error("🛑 Broker module not found. Aborting execution.")
-        return
+        return False
 
     try:
         if isinstance(module, dict) and "start_trading" in module:
@@ -109,20 +130,192 @@ def run_trading_flow():
             module.main()
         else:
             logging.warning("⚠️ No entry function (main/start_trading) found.")
+        return True
     except Exception as e:
         logging.exception(f"💥 Trading execution failed: {e}")
+        return False
     finally:
         logging.info("✅ Orchestration complete.")
         logging.info(f"🗂 Log saved to: {log_file}")
 
+# ============================================================
+# Multi-target Execution
+# ============================================================
+def parse_targets(spec: str):
+    """Parse "broker:account:strategy,..." into (broker, account, strategy) tuples."""
+    targets = []
+    for chunk in spec.split(","):
+        chunk = chunk.strip()
+        if not chunk:
+            continue
+        parts = [p.strip() for p in chunk.split(":")]
+        if len(parts) != 3 or not all(parts):
+            raise ValueError(f"Invalid target '{chunk}', expected broker:account:strategy")
+        targets.append((parts[0].lower(), parts[1], parts[2].lower()))
+    return targets
+
+
+# Values replaced by the last apply_account_env() call: {VAR: previous value or None}
+_overlaid_env = {}
+
+
+def clear_account_env():
+    """Undo the previous account's overlay so none of its values leak into the next one."""
+    for key, previous in _overlaid_env.items():
+        if previous is None:
+            os.environ.pop(key, None)
+        else:
+            os.environ[key] = previous
+    _overlaid_env.clear()
+
+
+def apply_account_env(account: str):
+    """Expose "<ACCOUNT>__<VAR>" env vars as <VAR> for this process only."""
+    clear_account_env()
+    prefix = f"{account.upper()}__"
+    overlay = {
+        key[len(prefix):]: value
+        for key, value in os.environ.items()
+        if key.upper().startswith(prefix)
+    }
+    # Keep each account's order journal separate so client order IDs never collide.
+    overlay.setdefault("ORDER_JOURNAL_PATH", f"order_journal_{account}.jsonl")
+    for key, value in overlay.items():
+        _overlaid_env[key] = os.environ.get(key)
+        os.environ[key] = value
+
+
+def run_target(target) -> dict:
+    """Worker entry point: run one (broker, account, strategy) target in isolation."""
+    broker_name, account, strategy = target
+    apply_account_env(account)
+    os.environ["BROKER"] = broker_name
+    os.environ["STRATEGY"] = strategy
+    # Settings may have been inherited from the parent; rebuild them for this account.
+    reload_settings()
+    setup_logging(suffix=f"{broker_name}_{account}")
+
+    logging.info(f"🧵 Worker {os.getpid()} | {broker_name} / {account} / {strategy}")
+    started = time.monotonic()
+    ok = run_trading_flow(broker_name)
+    return {
+        "broker": broker_name,
+        "account": account,
+        "strategy": strategy,
+        "ok": ok,
+        "seconds": round(time.monotonic() - started, 2),
+        "log_file": log_file,
+    }
+
+
+def _target_worker(index, target, results):
+    """Child-process body: run one target and report back through the queue."""
+    try:
+        results.put((index, run_target(target)))
+    except Exception as e:
+        logging.exception(f"💥 Target {target} crashed: {e}")
+        broker_name, account, strategy = target
+        results.put((index, {"broker": broker_name, "account": account,
+                             "strategy": strategy, "ok": False, "seconds": None}))
+
+
+def run_targets(targets):
+    """
+    Run every target in a fresh, dedicated process and aggregate the results.
+
+    Processes are spawned (not forked or pooled), so no two accounts ever share
+    an interpreter: environment overlays, imported broker clients and the
+    process-wide rate limiter all start clean for each target.
+    """
+    logging.info(f"🚦 Running {len(targets)} targets in parallel ...")
+    ctx = multiprocessing.get_context("spawn")
+    result_queue = ctx.Queue()
+    procs = [
+        ctx.Process(target=_target_worker, args=(i, t, result_queue),
+                    name=f"target-{t[0]}-{t[1]}")
+        for i, t in enumerate(targets)
+    ]
+    for proc in procs:
+        proc.start()
+
+    collected = {}
+    while len(collected) < len(targets):
+        try:
+            index, result = result_queue.get(timeout=1.0)
+            collected[index] = result
+        except queue.Empty:
+            if not any(p.is_alive() for p in procs) and result_queue.empty():
+                break
+    for proc in procs:
+        proc.join()
+
+    results = []
+    for i, (broker_name, account, strategy) in enumerate(targets):
+        if i not in collected:
+            logging.error(f"💥 Worker for {broker_name}/{account} exited "
+                          f"without a result (exit code {procs[i].exitcode})")
+            collected[i] = {"broker": broker_name, "account": account,
+                            "strategy": strategy, "ok": False, "seconds": None}
+        results.append(collected[i])
+
+    for r in sorted(results, key=lambda r: (r["broker"], r["account"])):
+        status = "✅" if r["ok"] else "❌"
+        logging.info(f"{status} {r['broker']}/{r['account']}/{r['strategy']} in {r['seconds']}s")
+    failed = sum(1 for r in results if not r["ok"])
+    logging.info(f"📊 Targets finished: {len(results) - failed} ok, {failed} failed")
+    return results
+
+# ============================================================
+# Calendar Gate & Scheduler
+# ============================================================
+def calendar_allows_run() -> bool:
+    """Check the NSE calendar before any login or DynamoDB work (FORCE_RUN bypasses it)."""
+    settings = get_settings()
+    if settings.force_run:
+        logging.info("⏩ FORCE_RUN set, skipping calendar check.")
+        return True
+    ok, reason = should_run(settings.run_window)
+    if not ok:
+        logging.info(f"🛌 Skipping run ({settings.run_window} window): {reason}")
+    return ok
+
+
+def run_once():
+    if not calendar_allows_run():
+        return
+    settings = get_settings()
+    logging.info("🎯 Starting DSG Trade Orchestrator ...")
+    if settings.targets:
+        run_targets(parse_targets(settings.targets))
+    else:
+        run_trading_flow(settings.broker)
+
+
+def run_scheduled():
+    """Run every schedule_every_minutes, sleeping straight to the next tradable slot."""
+    while True:
+        run_once()
+        settings = get_settings()
+        if not settings.schedule_every_minutes:
+            logging.info("⏹ schedule_every_minutes reloaded to 0; stopping the scheduler.")
+            return
+        when = next_run(settings.schedule_every_minutes, settings.run_window)
+        logging.info(f"⏰ Next run at {when:%Y-%m-%d %H:%M:%S} IST")
+        sleep_until(when)
+
 # ============================================================
 # Entrypoint
 # ============================================================
 if __name__ == "__main__":
+    setup_logging()
+    watch_settings()
     logging.info("=" * 45)
     logging.info(f"🧭 DSG Trading Orchestrator | {datetime.now()}")
-    logging.info(f"💼 Selected Broker : {BROKER}")
-    logging.info(f"📊 Selected Strategy : {STRATEGY}")
+    settings = get_settings()
+    logging.info(f"💼 Selected Broker : {settings.broker}")
+    logging.info(f"📊 Selected Strategy : {settings.strategy}")
     logging.info("=" * 45)
-    logging.info("🎯 Starting DSG Trade Orchestrator ...")
-    run_trading_flow()
+    if settings.schedule_every_minutes:
+        run_scheduled()
+    else:
+        run_once()
@@ -5,16 +5,21 @@ Updates eligibility status of stocks in DynamoDB based on Chartink scans.
 - Fetches Chartink scan results using a predefined RSI/EMA condition.
 - Compares those results with all entries in DynamoDB 'StockEligibility' table.
 - Marks stocks as 'Eligible' or 'Ineligible' accordingly.
-- Resets BaseValue and FirstDayProcessed for ineligible stocks.
+- Resets BaseValue, AveragingLevel and FirstDayProcessed for ineligible stocks.
 - Sets FirstDayProcessed = True for newly eligible ones.
+- Keeps a local snapshot of the previous run's eligible set, so normal runs
+  only touch instruments whose screener membership changed (a full table
+  scan still happens on first run and every full_resync_hours).
 
 Can be called directly via run() or imported as a reusable signal provider.
 """
 
 import os
+import json
 import logging
 from time import sleep
-from datetime import datetime
+from datetime import datetime, timedelta
+from functools import lru_cache
 
 import boto3
 import pytz
@@ -22,6 +27,9 @@ import requests
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
+from config import get_settings
+from storage.stock_state import StockState, states_from_dynamo
+
 # --------------------------------------------------------------------------
 # Setup logging and environment
 # --------------------------------------------------------------------------
@@ -32,11 +40,21 @@ load_dotenv()
 # --------------------------------------------------------------------------
 # Initialize clients and constants
 # --------------------------------------------------------------------------
-dynamodb = boto3.client("dynamodb", region_name="ap-south-1")
+# The DynamoDB client is resolved from the current settings on every use (and
+# cached per region), so a hot reload of aws_region takes effect without a restart.
+@lru_cache(maxsize=4)
+def _dynamodb_for(region):
+    return boto3.client("dynamodb", region_name=region)
+
+
+def get_dynamodb():
+    """DynamoDB client for the configured region."""
+    return _dynamodb_for(get_settings().aws_region)
+
 
 CHARTINK_URL = "https://chartink.com/screener/process"
 CHARTINK_LINK = "https://chartink.com/screener/"
-CONDITION = "( {166311} ( latest rsi(65) < latest ema(rsi(65),35) or weekly rsi(65) < weekly ema(rsi(65),35) ) )"
+# Screener condition, table name and snapshot settings come from config.settings
 
 
 # --------------------------------------------------------------------------
@@ -76,10 +94,10 @@ def fetch_chartink_data(condition: str):
 # DynamoDB helpers
 # --------------------------------------------------------------------------
 def fetch_all_stocks_from_dynamodb():
-    """Fetch all stocks from DynamoDB StockEligibility table."""
+    """Fetch all stocks from DynamoDB StockEligibility table as StockState rows."""
     try:
-        response = dynamodb.scan(TableName="StockEligibility")
-        return response["Items"]
+        response = get_dynamodb().scan(TableName=get_settings().stock_table)
+        return states_from_dynamo(response["Items"])
     except Exception as e:
         logging.error(f"Error fetching items from DynamoDB: {e}")
         return []
@@ -95,21 +113,57 @@ def update_dynamodb_stock(stock, eligibility_status, first_day_processed, curren
             ":fd": {"BOOL": first_day_processed},
         }
         if reset_base:
-            update_expression += ", BaseValue = :bv"
+            update_expression += ", BaseValue = :bv, AveragingLevel = :lv"
             expr_values[":bv"] = {"NULL": True}
+            expr_values[":lv"] = {"N": "0"}
 
-        dynamodb.update_item(
-            TableName="StockEligibility",
-            Key={
-                "InstrumentName": {"S": stock["InstrumentName"]["S"].strip()},
-                "Eligibility": {"S": stock["Eligibility"]["S"].strip()},
-            },
+        get_dynamodb().update_item(
+            TableName=get_settings().stock_table,
+            Key=stock.key,
             UpdateExpression=update_expression,
             ExpressionAttributeValues=expr_values,
         )
-        logging.info(f"✅ Updated {stock['InstrumentName']['S']} → {eligibility_status}")
+        logging.info(f"✅ Updated {stock.instrument} → {eligibility_status}")
+        return True
+    except Exception as e:
+        logging.error(f"Error updating {stock.instrument}: {e}")
+        return False
+
+
+# --------------------------------------------------------------------------
+# Snapshot of the previous run
+# --------------------------------------------------------------------------
+def load_snapshot():
+    """Load the previous run's snapshot, or None if missing/unreadable."""
+    path = get_settings().eligibility_snapshot_path
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
     except Exception as e:
-        logging.error(f"Error updating {stock['InstrumentName']['S']}: {e}")
+        logging.warning(f"Ignoring unreadable eligibility snapshot {path}: {e}")
+        return None
+
+
+def save_snapshot(snapshot):
+    """Write the snapshot atomically (temp file + rename)."""
+    path = get_settings().eligibility_snapshot_path
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def full_resync_due(snapshot, now):
+    settings = get_settings()
+    if not snapshot or settings.force_full_sync:
+        return True
+    try:
+        last_full = datetime.fromisoformat(snapshot["full_scan_at"])
+    except (KeyError, ValueError):
+        return True
+    return now.replace(tzinfo=None) - last_full >= timedelta(hours=settings.full_resync_hours)
 
 
 # --------------------------------------------------------------------------
@@ -120,19 +174,34 @@ def update_stock_eligibility():
     now = datetime.now(pytz.timezone("Asia/Kolkata"))
     current_time = now.strftime("%Y-%m-%dT%H:%M:%S")
 
-    chartink_data = fetch_chartink_data(CONDITION)
+    chartink_data = fetch_chartink_data(get_settings().chartink_condition)
     if not chartink_data:
         logging.error("No data fetched from Chartink.")
         return
 
     eligible_instruments = {item["nsecode"] for item in chartink_data["data"]}
+    snapshot = load_snapshot()
+
+    if full_resync_due(snapshot, now):
+        full_eligibility_sync(eligible_instruments, current_time)
+    else:
+        incremental_eligibility_sync(snapshot, eligible_instruments, current_time)
+
+
+def full_eligibility_sync(eligible_instruments, current_time):
+    """Scan the whole table and re-evaluate every row, then refresh the snapshot."""
+    logging.info("🔄 Running full eligibility sync ...")
     all_stocks = fetch_all_stocks_from_dynamodb()
+    if not all_stocks:
+        return
+    stocks = {}
 
     for stock in all_stocks:
-        instrument = stock["InstrumentName"]["S"].strip()
+        instrument = stock.instrument
         is_eligible = instrument in eligible_instruments
         eligibility_status = "Eligible" if is_eligible else "Ineligible"
-        first_day_processed = stock.get("FirstDayProcessed", {"BOOL": False})["BOOL"]
+        first_day_processed = stock.first_day_processed
+        stocks[instrument] = {"Eligibility": stock.eligibility_key, "eligible": stock.is_eligible}
 
         if is_eligible and not first_day_processed:
             first_day_processed = True
@@ -141,19 +210,48 @@ def update_stock_eligibility():
             first_day_processed = False
             reset_base = True
         else:
-            base_attr = stock.get("BaseValue", {})
-            if not isinstance(base_attr, dict) or "N" not in base_attr:
+            if stock.base_value is None:
                 logging.info(f"Skipping {instrument}: invalid BaseValue.")
                 continue
             reset_base = False
 
-        update_dynamodb_stock(
+        if update_dynamodb_stock(
             stock,
             eligibility_status,
             first_day_processed,
             current_time,
             reset_base=reset_base,
-        )
+        ):
+            stocks[instrument]["eligible"] = is_eligible
+
+    save_snapshot({"full_scan_at": current_time, "taken_at": current_time, "stocks": stocks})
+
+
+def incremental_eligibility_sync(snapshot, eligible_instruments, current_time):
+    """Only apply transitions for instruments whose screener membership changed."""
+    stocks = snapshot["stocks"]
+    previous = {name for name, s in stocks.items() if s.get("eligible")}
+    current = eligible_instruments & stocks.keys()
+
+    newly_eligible = current - previous
+    newly_ineligible = previous - current
+    logging.info(f"🔁 Incremental sync: {len(newly_eligible)} newly eligible, "
+                 f"{len(newly_ineligible)} newly ineligible, {len(stocks)} tracked.")
+
+    for instrument in sorted(newly_eligible | newly_ineligible):
+        is_eligible = instrument in newly_eligible
+        stock = StockState(instrument, eligibility_key=stocks[instrument]["Eligibility"])
+        if update_dynamodb_stock(
+            stock,
+            "Eligible" if is_eligible else "Ineligible",
+            is_eligible,
+            current_time,
+            reset_base=not is_eligible,
+        ):
+            stocks[instrument]["eligible"] = is_eligible
+
+    snapshot["taken_at"] = current_time
+    save_snapshot(snapshot)
 
 
 # --------------------------------------------------------------------------
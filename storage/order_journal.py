@@ -0,0 +1,207 @@
+# storage/order_journal.py
+"""
+Append-only, crash-resumable order journal.
+
+Every order moves through a small set of states, and each transition is
+appended to a JSON-lines file as one record tagged with a client order ID:
+
+    INTENT     -> order computed, not yet sent to the broker
+    SUBMITTED  -> about to hit the broker (fsync'd before the network call)
+    ACK        -> broker returned an order ID
+    FILLED     -> broker reports the order complete and its side effects are persisted
+    REJECTED   -> broker accepted the order ID, then rejected / cancelled it
+    FAILED     -> broker explicitly refused the order (no order ID)
+
+An exception or timeout while submitting leaves the order in SUBMITTED: the
+request may still have reached the broker, so it must not be retried blindly.
+
+On restart the journal is replayed and the latest state per client order ID
+decides what the caller does:
+
+- INTENT / FAILED / REJECTED -> safe to (re)submit
+- SUBMITTED                  -> outcome unknown, never resubmitted automatically
+- ACK                        -> already at the broker, only needs a status check
+- FILLED                     -> done
+
+Writes are buffered and fsync'd in batches; only the SUBMITTED record is
+forced to disk immediately, since that is the one that prevents a double buy.
+"""
+
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+
+INTENT = "INTENT"
+SUBMITTED = "SUBMITTED"
+ACK = "ACK"
+FILLED = "FILLED"
+REJECTED = "REJECTED"
+FAILED = "FAILED"
+
+STATES = (INTENT, SUBMITTED, ACK, FILLED, REJECTED, FAILED)
+
+
+def make_client_order_id(symbol: str, purpose: str, trade_date=None) -> str:
+    """Deterministic client order ID, so a re-run on the same day maps to the same entry."""
+    day = (trade_date or datetime.now()).strftime("%Y%m%d")
+    return f"{day}-{purpose}-{symbol}".upper()
+
+
+class OrderJournal:
+    """
+    Append-only JSON-lines journal of order state transitions. Safe to share
+    between the threads of one process.
+
+    Usage:
+        with OrderJournal("order_journal.jsonl") as journal:
+            if journal.should_submit(coid):
+                journal.record(coid, INTENT, purpose=..., symbol=..., quantity=...)
+                journal.record(coid, SUBMITTED)
+                ...
+    """
+
+    def __init__(self, path: str, sync_every: int = 20):
+        self.path = path
+        self.sync_every = max(1, int(sync_every))
+        self.entries = {}
+        self._pending = 0
+        self._lock = threading.RLock()
+        self._replay()
+        self._fh = open(self.path, "a", encoding="utf-8")
+        if self._fh.tell() > 0 and not self._ends_with_newline():
+            # Terminate a torn last line so the next record starts cleanly.
+            self._fh.write("\n")
+
+    # --------------------------------------------------------------
+    # Replay
+    # --------------------------------------------------------------
+    def _replay(self):
+        """Rebuild the latest state per client order ID from disk."""
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line from a crash mid-write is expected; skip it.
+                    logging.warning(f"⚠️ Skipping unreadable journal line {line_no} in {self.path}")
+                    continue
+                self._apply(record)
+
+        logging.info(f"📒 Replayed order journal: {len(self.entries)} orders from {self.path}")
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def _apply(self, record: dict):
+        coid = record.get("client_order_id")
+        if not coid:
+            return
+        entry = self.entries.setdefault(coid, {})
+        entry.update({k: v for k, v in record.items() if v is not None})
+
+    # --------------------------------------------------------------
+    # Writes
+    # --------------------------------------------------------------
+    def record(self, client_order_id: str, state: str, durable: bool = False, **fields) -> dict:
+        """Append a state transition. `durable=True` forces an fsync before returning."""
+        if state not in STATES:
+            raise ValueError(f"Unknown journal state: {state}")
+
+        record = {
+            "ts": datetime.now().isoformat(timespec="milliseconds"),
+            "client_order_id": client_order_id,
+            "state": state,
+            **fields,
+        }
+        line = json.dumps(record, default=str) + "\n"
+        with self._lock:
+            self._fh.write(line)
+            self._apply(record)
+            self._pending += 1
+
+            if durable or state == SUBMITTED or self._pending >= self.sync_every:
+                self.sync()
+        return record
+
+    def record_many(self, client_order_ids, state: str, **fields) -> int:
+        """
+        Append the same transition for a whole batch with a single fsync, e.g.
+        SUBMITTED for every staged order just before a burst is released.
+        """
+        if state not in STATES:
+            raise ValueError(f"Unknown journal state: {state}")
+        ts = datetime.now().isoformat(timespec="milliseconds")
+        records = [{"ts": ts, "client_order_id": coid, "state": state, **fields}
+                   for coid in client_order_ids]
+        with self._lock:
+            self._fh.write("".join(json.dumps(r, default=str) + "\n" for r in records))
+            for record in records:
+                self._apply(record)
+            self.sync()
+        return len(records)
+
+    def sync(self):
+        """Flush buffered records and fsync them to disk."""
+        with self._lock:
+            if self._fh.closed:
+                return
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+            self._pending = 0
+
+    def close(self):
+        if not self._fh.closed:
+            self.sync()
+            self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # --------------------------------------------------------------
+    # Queries
+    # --------------------------------------------------------------
+    def state(self, client_order_id: str):
+        return self.entries.get(client_order_id, {}).get("state")
+
+    def get(self, client_order_id: str) -> dict:
+        return self.entries.get(client_order_id, {})
+
+    def should_submit(self, client_order_id: str) -> bool:
+        """True only when the order has never reached the broker (or was rejected)."""
+        return self.state(client_order_id) in (None, INTENT, FAILED, REJECTED)
+
+    def purpose(self, client_order_id: str) -> str:
+        """
+        Purpose recorded on the INTENT (e.g. "FIRSTDAY", "AVG"); entries written
+        before it was recorded fall back to the ID itself ("...-AVG3-..." -> "AVG").
+        """
+        purpose = self.get(client_order_id).get("purpose")
+        if purpose:
+            return purpose
+        parts = client_order_id.split("-", 2)
+        return parts[1].rstrip("0123456789") if len(parts) == 3 else ""
+
+    def pending_status(self, purpose: str = None):
+        """
+        Client order IDs that were acknowledged but not yet confirmed filled,
+        optionally only those of one purpose.
+        """
+        return [coid for coid, e in self.entries.items()
+                if e.get("state") == ACK and (purpose is None or self.purpose(coid) == purpose)]
+
+    def in_doubt(self):
+        """Client order IDs whose submission outcome is unknown (crash after SUBMITTED)."""
+        return [coid for coid, e in self.entries.items() if e.get("state") == SUBMITTED]
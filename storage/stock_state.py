@@ -0,0 +1,128 @@
+# storage/stock_state.py
+"""
+Typed row model for the StockEligibility data.
+
+Strategies used to unwrap DynamoDB wire-format dicts
+(`stock["InstrumentName"]["S"]`, `stock.get("BaseValue", {}).get("N")`, ...)
+on every access. StockState parses an item exactly once into a compact
+__slots__ object, and the same model is produced from the offline CSV rows,
+so every module reads the same attributes regardless of where the row came from.
+"""
+
+__all__ = ["StockState", "states_from_dynamo", "states_from_csv"]
+
+
+def _num(attr):
+    """DynamoDB {"N": "..."} -> float, or None for missing / NULL / empty."""
+    if not attr:
+        return None
+    value = attr.get("N")
+    if value in (None, ""):
+        return None
+    return float(value)
+
+
+def _csv_num(value):
+    if value in (None, ""):
+        return None
+    return float(value)
+
+
+class StockState:
+    """
+    One StockEligibility row.
+
+    Attributes:
+        instrument (str): InstrumentName (partition key).
+        eligibility_key (str): Eligibility (sort key).
+        status (str): EligibilityStatus ("Eligible" / "Ineligible").
+        token (int | None): Exchange token, if stored on the row.
+        default_qty (int): DefaultQuantity.
+        base_value (float | None): First-day BaseValue, None when unset.
+        first_day_processed (bool): FirstDayProcessed flag.
+        averaging_level (int): Ladder rungs already bought.
+        last_updated (str | None): LastUpdated timestamp.
+    """
+
+    __slots__ = (
+        "instrument", "eligibility_key", "status", "token", "default_qty",
+        "base_value", "first_day_processed", "averaging_level", "last_updated",
+    )
+
+    def __init__(self, instrument, eligibility_key="Eligible", status="", token=None,
+                 default_qty=0, base_value=None, first_day_processed=False,
+                 averaging_level=0, last_updated=None):
+        self.instrument = instrument
+        self.eligibility_key = eligibility_key
+        self.status = status
+        self.token = token
+        self.default_qty = default_qty
+        self.base_value = base_value
+        self.first_day_processed = first_day_processed
+        self.averaging_level = averaging_level
+        self.last_updated = last_updated
+
+    def __repr__(self):
+        return (f"StockState({self.instrument!r}, status={self.status!r}, token={self.token}, "
+                f"qty={self.default_qty}, base={self.base_value}, fdp={self.first_day_processed})")
+
+    @property
+    def is_eligible(self) -> bool:
+        return self.status == "Eligible"
+
+    @property
+    def has_base(self) -> bool:
+        return self.base_value is not None and self.base_value > 0
+
+    @property
+    def key(self) -> dict:
+        """DynamoDB primary key for update_item."""
+        return {
+            "InstrumentName": {"S": self.instrument},
+            "Eligibility": {"S": self.eligibility_key},
+        }
+
+    # --------------------------------------------------------------
+    # Deserializers
+    # --------------------------------------------------------------
+    @classmethod
+    def from_dynamo(cls, item: dict) -> "StockState":
+        """Parse a StockEligibility item in DynamoDB wire format."""
+        get = item.get
+        token = _num(get("Token"))
+        qty = _num(get("DefaultQuantity"))
+        level = _num(get("AveragingLevel"))
+        return cls(
+            instrument=item["InstrumentName"]["S"].strip(),
+            eligibility_key=(get("Eligibility") or {}).get("S", "Eligible").strip(),
+            status=(get("EligibilityStatus") or {}).get("S", ""),
+            token=None if token is None else int(token),
+            default_qty=0 if qty is None else int(qty),
+            base_value=_num(get("BaseValue")),
+            first_day_processed=bool((get("FirstDayProcessed") or {}).get("BOOL", False)),
+            averaging_level=0 if level is None else int(level),
+            last_updated=(get("LastUpdated") or {}).get("S"),
+        )
+
+    @classmethod
+    def from_csv_row(cls, row: dict) -> "StockState":
+        """Parse a row of the offline eligible_stocks.csv."""
+        qty = _csv_num(row.get("DefaultQuantity"))
+        token = _csv_num(row.get("Token"))
+        return cls(
+            instrument=(row.get("InstrumentName") or "").strip(),
+            status=row.get("EligibilityStatus", "") or "",
+            token=None if token is None else int(token),
+            default_qty=0 if qty is None else int(qty),
+            base_value=_csv_num(row.get("BaseValue")),
+            first_day_processed=(row.get("FirstDayProcessed") or "False").strip().lower() == "true",
+        )
+
+
+def states_from_dynamo(items):
+    """Parse a list of DynamoDB items, skipping rows without an InstrumentName."""
+    return [StockState.from_dynamo(i) for i in items if "InstrumentName" in i]
+
+
+def states_from_csv(rows):
+    return [StockState.from_csv_row(r) for r in rows if r.get("InstrumentName")]
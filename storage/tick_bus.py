@@ -0,0 +1,198 @@
+# storage/tick_bus.py
+"""
+Shared-memory tick bus.
+
+A single feed process (Rupeezy-WebSocket/ws_manager.py) publishes the latest
+price for every instrument into a `multiprocessing.shared_memory` block, and
+any number of strategy processes attach to it and read prices directly out of
+that memory, without their own WebSocket login or connection.
+
+Layout (all arrays indexed directly by instrument token):
+
+    seq[capacity]  uint64   per-slot seqlock counter (odd = write in progress)
+    ltp[capacity]  float64  last traded price
+    ts[capacity]   float64  publish time (epoch seconds)
+
+The table is sized from the highest token in the instrument registry (NSE_EQ
+tokens go well past 65535), so every listed instrument has a slot.
+
+There is exactly one writer. Readers never block it: they retry a slot whose
+sequence number was odd or changed while it was being read, up to
+MAX_READ_RETRIES times, so a writer that died mid-write cannot hang them.
+"""
+
+import logging
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+DEFAULT_NAME = "dsg_tick_bus"
+FALLBACK_CAPACITY = 1 << 20  # used when the instrument registry is unavailable
+MAX_READ_RETRIES = 1000
+_HEADER = 16               # magic (uint64) + capacity (uint64)
+_MAGIC = 0x4453475449434B31  # "DSGTICK1"
+
+
+def registry_capacity() -> int:
+    """Slots needed for every token in the instrument registry, rounded up to 4096."""
+    try:
+        from brokers.Rupeezy.instruments import max_token
+        highest = max_token()
+    except Exception as e:
+        logging.warning(f"⚠️ Instrument registry unavailable ({e}); using {FALLBACK_CAPACITY} slots")
+        return FALLBACK_CAPACITY
+    if highest <= 0:
+        return FALLBACK_CAPACITY
+    return (highest // 4096 + 1) * 4096
+
+
+def _layout(buf, capacity):
+    """Return numpy views (header, seq, ltp, ts) over a shared buffer."""
+    header = np.ndarray((2,), dtype=np.uint64, buffer=buf, offset=0)
+    seq = np.ndarray((capacity,), dtype=np.uint64, buffer=buf, offset=_HEADER)
+    ltp = np.ndarray((capacity,), dtype=np.float64, buffer=buf, offset=_HEADER + 8 * capacity)
+    ts = np.ndarray((capacity,), dtype=np.float64, buffer=buf, offset=_HEADER + 16 * capacity)
+    return header, seq, ltp, ts
+
+
+class TickBusWriter:
+    """Owner of the shared block; only the feed process should create one."""
+
+    def __init__(self, name: str = DEFAULT_NAME, capacity: int = None):
+        self.capacity = int(capacity or registry_capacity())
+        self._dropped = 0
+        size = _HEADER + 24 * self.capacity
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Left over from a crashed feed process: take it over.
+            self.shm = shared_memory.SharedMemory(name=name)
+            if self.shm.size < size:
+                raise ValueError(f"Existing tick bus '{name}' is too small ({self.shm.size} < {size})")
+        header, self.seq, self.ltp, self.ts = _layout(self.shm.buf, self.capacity)
+        self.seq[:] = 0
+        self.ltp[:] = np.nan
+        self.ts[:] = 0.0
+        header[1] = self.capacity
+        header[0] = _MAGIC
+        logging.info(f"🚌 Tick bus '{name}' ready ({self.capacity} slots, {size} bytes)")
+
+    def publish(self, token: int, ltp: float, ts: float = None):
+        """Seqlock write of a single tick. Tokens outside the table are dropped (and logged)."""
+        if not 0 <= token < self.capacity:
+            self._drop(1, token)
+            return
+        self.seq[token] += 1          # odd: readers back off
+        self.ltp[token] = ltp
+        self.ts[token] = time.time() if ts is None else ts
+        self.seq[token] += 1          # even: slot consistent again
+
+    def publish_many(self, tokens, ltps, ts: float = None):
+        """Vectorized publish of a batch of ticks."""
+        tokens = np.asarray(tokens, dtype=np.int64)
+        keep = (tokens >= 0) & (tokens < self.capacity)
+        if not keep.all():
+            self._drop(int((~keep).sum()), int(tokens[~keep][0]))
+        tokens = tokens[keep]
+        self.seq[tokens] += 1
+        self.ltp[tokens] = np.asarray(ltps, dtype=np.float64)[keep]
+        self.ts[tokens] = time.time() if ts is None else ts
+        self.seq[tokens] += 1
+
+    def _drop(self, count, token):
+        # Log the first drop and then every 1000th, so a bad token can't flood the log.
+        if self._dropped % 1000 == 0:
+            logging.warning(f"⚠️ Tick bus dropped token {token}: outside {self.capacity} slots "
+                            f"({self._dropped + count} dropped so far)")
+        self._dropped += count
+
+    def close(self, unlink: bool = True):
+        # Drop our views before closing, otherwise the buffer cannot be released.
+        self.seq = self.ltp = self.ts = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+class TickBusReader:
+    """Read-only attachment to a tick bus created by TickBusWriter."""
+
+    def __init__(self, name: str = DEFAULT_NAME):
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Python < 3.13: attach, then stop the resource tracker from unlinking
+            # the writer's block when this reader exits.
+            from multiprocessing import resource_tracker
+            self.shm = shared_memory.SharedMemory(name=name)
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+
+        header = np.ndarray((2,), dtype=np.uint64, buffer=self.shm.buf)
+        if int(header[0]) != _MAGIC:
+            raise ValueError(f"Shared memory '{name}' is not an initialized tick bus")
+        self.capacity = int(header[1])
+        del header
+        _, self.seq, self.ltp, self.ts = _layout(self.shm.buf, self.capacity)
+        # Typed memoryviews over the same memory: much cheaper than numpy
+        # scalar indexing for single-token reads.
+        cap = self.capacity
+        self._seq_mv = self.shm.buf[_HEADER:_HEADER + 8 * cap].cast("Q")
+        self._ltp_mv = self.shm.buf[_HEADER + 8 * cap:_HEADER + 16 * cap].cast("d")
+        self._ts_mv = self.shm.buf[_HEADER + 16 * cap:_HEADER + 24 * cap].cast("d")
+
+    def read(self, token: int, max_age: float = None):
+        """
+        Consistent (ltp, ts) for one token, or None if never published, older
+        than max_age, or still torn after MAX_READ_RETRIES attempts.
+        """
+        if not 0 <= token < self.capacity:
+            return None
+        seq = self._seq_mv
+        for _ in range(MAX_READ_RETRIES):
+            before = seq[token]
+            if before & 1:
+                continue
+            ltp = self._ltp_mv[token]
+            ts = self._ts_mv[token]
+            if seq[token] == before:
+                break
+        else:
+            return None
+        if before == 0 or (max_age is not None and time.time() - ts > max_age):
+            return None
+        return ltp, ts
+
+    def read_many(self, tokens, max_age: float = None):
+        """
+        Consistent LTPs for many tokens. Returns a float64 array with NaN for
+        tokens that were never published, are older than max_age, or stayed
+        torn for MAX_READ_RETRIES attempts.
+        """
+        tokens = np.asarray(tokens, dtype=np.int64)
+        out = np.full(tokens.shape, np.nan)
+        stamps = np.zeros(tokens.shape)
+        todo = np.flatnonzero((tokens >= 0) & (tokens < self.capacity))
+        for _ in range(MAX_READ_RETRIES):
+            if not todo.size:
+                break
+            idx = tokens[todo]
+            before = self.seq[idx].copy()
+            out[todo] = self.ltp[idx]
+            stamps[todo] = self.ts[idx]
+            torn = (before & 1).astype(bool) | (self.seq[idx] != before)
+            todo = todo[torn]
+        out[todo] = np.nan
+        unpublished = np.zeros(tokens.shape, dtype=bool)
+        valid = (tokens >= 0) & (tokens < self.capacity)
+        unpublished[valid] = self.seq[tokens[valid]] == 0
+        out[unpublished] = np.nan
+        if max_age is not None:
+            out[time.time() - stamps > max_age] = np.nan
+        return out
+
+    def close(self):
+        for mv in (self._seq_mv, self._ltp_mv, self._ts_mv):
+            mv.release()
+        self.seq = self.ltp = self.ts = None
+        self.shm.close()
@@ -0,0 +1,299 @@
+"""
+additional_quantity.py
+----------------------
+Vectorized averaging-down engine for eligible stocks.
+
+Once a stock has a first-day BaseValue, extra quantity is added each time its
+LTP falls through another rung of a drop ladder below that base (e.g. -3%,
+-6%, -9% ...). All eligible stocks are held as NumPy arrays so a single price
+update is evaluated for the whole universe in one vectorized pass, and the
+resulting add-on orders are emitted to the broker as one batch.
+
+Author: Chaitanya / DSG Project
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from config import get_settings
+
+# ============================================================
+# 1️⃣ Ladder Configuration
+# ============================================================
+
+# Fractional drops below BaseValue at which another tranche is bought
+DEFAULT_LADDER = (0.03, 0.06, 0.09, 0.12, 0.15)
+# Tranche size per rung, as a multiple of DefaultQuantity
+DEFAULT_MULTIPLIERS = (1, 1, 1, 1, 1)
+
+# ============================================================
+# 2️⃣ Engine
+# ============================================================
+
+
+class AveragingEngine:
+    """
+    Struct-of-arrays state for the averaging ladder.
+
+    Args:
+        symbols (list[str]): Instrument names, one per row.
+        tokens (array-like): Exchange tokens, one per row.
+        base_values (array-like): First-day BaseValue per row (<= 0 means unset).
+        default_qty (array-like): DefaultQuantity per row.
+        levels_done (array-like, optional): Ladder rungs already bought per row.
+        ladder (tuple): Fractional drop thresholds, ascending.
+        multipliers (tuple): DefaultQuantity multiple bought at each rung.
+    """
+
+    def __init__(self, symbols, tokens, base_values, default_qty, levels_done=None,
+                 ladder=DEFAULT_LADDER, multipliers=DEFAULT_MULTIPLIERS):
+        if len(ladder) != len(multipliers):
+            raise ValueError("ladder and multipliers must have the same length")
+
+        n = len(symbols)
+        self.symbols = np.asarray(symbols, dtype=object)
+        self.tokens = np.asarray(tokens, dtype=np.int64)
+        self.base = np.asarray(base_values, dtype=np.float64)
+        self.default_qty = np.asarray(default_qty, dtype=np.int64)
+        self.levels_done = (np.zeros(n, dtype=np.int64) if levels_done is None
+                            else np.asarray(levels_done, dtype=np.int64).copy())
+        self.ltp = np.full(n, np.nan, dtype=np.float64)
+
+        self.ladder = np.asarray(ladder, dtype=np.float64)
+        # cum_mult[k] = total multiples bought once k rungs are done
+        self.cum_mult = np.concatenate(([0], np.cumsum(multipliers))).astype(np.int64)
+
+        # Sorted token index so tick batches can be scattered without a Python loop
+        self._order = np.argsort(self.tokens, kind="stable")
+        self._sorted_tokens = self.tokens[self._order]
+
+    def __len__(self):
+        return len(self.symbols)
+
+    @classmethod
+    def from_states(cls, states, **kwargs):
+        """Build the engine from StockState rows (rows without a token are skipped)."""
+        rows = [s for s in states if s.token is not None]
+        return cls(
+            [s.instrument for s in rows],
+            [s.token for s in rows],
+            [s.base_value or 0.0 for s in rows],
+            [s.default_qty for s in rows],
+            [s.averaging_level for s in rows],
+            **kwargs,
+        )
+
+    # --------------------------------------------------------------
+    # Price updates
+    # --------------------------------------------------------------
+    def update_prices(self, tokens, ltps):
+        """Scatter a batch of (token, ltp) updates into the LTP array; unknown tokens are ignored."""
+        tokens = np.asarray(tokens, dtype=np.int64)
+        ltps = np.asarray(ltps, dtype=np.float64)
+        if tokens.size == 0 or len(self) == 0:
+            return
+
+        pos = np.searchsorted(self._sorted_tokens, tokens)
+        pos = np.minimum(pos, len(self._sorted_tokens) - 1)
+        known = self._sorted_tokens[pos] == tokens
+        self.ltp[self._order[pos[known]]] = ltps[known]
+
+    # --------------------------------------------------------------
+    # Evaluation
+    # --------------------------------------------------------------
+    def evaluate(self):
+        """
+        Work out every required add-on order in one pass.
+
+        Returns:
+            tuple: (rows, quantities, target_levels) as NumPy arrays.
+        """
+        valid = (self.base > 0) & (self.ltp > 0) & (self.default_qty > 0)
+        drop = np.zeros_like(self.ltp)
+        np.divide(self.ltp, self.base, out=drop, where=valid)
+        drop = np.where(valid, 1.0 - drop, -np.inf)
+
+        reached = np.searchsorted(self.ladder, drop, side="right")
+        due = np.maximum(reached - self.levels_done, 0)
+        qty = (self.cum_mult[reached] - self.cum_mult[np.minimum(self.levels_done, len(self.ladder))]) * self.default_qty
+        rows = np.flatnonzero((due > 0) & (qty > 0))
+        return rows, qty[rows], reached[rows]
+
+    def pending_orders(self):
+        """Required add-on orders as plain dicts, ready for the broker."""
+        rows, qty, levels = self.evaluate()
+        return [
+            {
+                "row": int(r),
+                "symbol": self.symbols[r],
+                "token": int(self.tokens[r]),
+                "quantity": int(q),
+                "level": int(lv),
+                "ltp": float(self.ltp[r]),
+            }
+            for r, q, lv in zip(rows, qty, levels)
+        ]
+
+    def mark_done(self, rows, levels):
+        """Record that the given rows have bought up to the given ladder levels."""
+        self.levels_done[np.asarray(rows, dtype=np.int64)] = np.asarray(levels, dtype=np.int64)
+
+
+def submit_batch(orders, submit, workers: int = None):
+    """
+    Send a batch of add-on orders concurrently.
+
+    Args:
+        orders (list[dict]): Output of AveragingEngine.pending_orders().
+        submit (callable): submit(order) -> truthy on success.
+
+    Returns:
+        list[dict]: Orders the broker accepted.
+    """
+    if not orders:
+        return []
+    workers = workers or get_settings().averaging_batch_workers
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(orders)))) as pool:
+        results = list(pool.map(submit, orders))
+    return [o for o, ok in zip(orders, results) if ok]
+
+# ============================================================
+# 3️⃣ Orchestrator Entry Point
+# ============================================================
+
+
+def run(broker=None):
+    """Evaluate the ladder once against current LTPs and place the add-on batch."""
+    from strategies import auto_buy_logic as abl
+    from storage.order_journal import (
+        OrderJournal, make_client_order_id, INTENT, SUBMITTED, ACK, FAILED
+    )
+
+    states = [s for s in abl.fetch_eligible_stocks() if s.first_day_processed]
+    engine = AveragingEngine.from_states(states)
+    if not len(engine):
+        logging.info("⚠️ No stocks with a first-day base to average.")
+        return
+
+    prices = abl.fetch_ltps(engine.tokens.tolist())
+    engine.update_prices(list(prices.keys()), list(prices.values()))
+    orders = engine.pending_orders()
+    logging.info(f"📐 Averaging engine: {len(orders)} add-on orders across {len(engine)} stocks")
+
+    with OrderJournal(get_settings().journal_path) as journal:
+        def submit(order):
+            coid = make_client_order_id(order["symbol"], f"AVG{order['level']}")
+            if not journal.should_submit(coid):
+                return False
+            journal.record(coid, INTENT, purpose="AVG", symbol=order["symbol"], token=order["token"],
+                           quantity=order["quantity"], level=order["level"])
+            journal.record(coid, SUBMITTED)
+            response = abl.place_order({
+                "symbol": order["symbol"],
+                "token": order["token"],
+                "transaction_type": "BUY",
+                "variety": "RL-MKT",
+                "quantity": order["quantity"],
+                "price": 0.0,
+                "trigger_price": 0.0,
+                "disclosed_quantity": 0,
+            })
+            if response is None:
+                # Exception / timeout: the order may be at the broker, leave it SUBMITTED.
+                logging.error(f"❓ No broker response for {order['symbol']}; left in doubt ({coid})")
+                return False
+            order_id = (response.get("data") or {}).get("orderId")
+            if not order_id:
+                journal.record(coid, FAILED, reason="no orderId")
+                return False
+            journal.record(coid, ACK, order_id=order_id)
+            return True
+
+        accepted = submit_batch(orders, submit)
+        engine.mark_done([o["row"] for o in accepted], [o["level"] for o in accepted])
+
+        # One settle wait, then confirm this run's orders together with any
+        # averaging orders a previous run left acknowledged.
+        if accepted:
+            time.sleep(10)
+        filled = reconcile_fills(journal)
+
+    logging.info(f"🏁 Averaging complete: {len(accepted)}/{len(orders)} orders accepted, "
+                 f"{filled} fills confirmed.")
+
+
+def reconcile_fills(journal):
+    """
+    Confirm acknowledged averaging orders and persist AveragingLevel once they fill.
+
+    FILLED is journaled only after the level is written, so a failed write is
+    retried on the next run. Fills journaled before that rule (without
+    level_persisted) are written again as well.
+
+    Returns:
+        int: Number of orders confirmed filled in this call.
+    """
+    from strategies import auto_buy_logic as abl
+    from storage.order_journal import FILLED, REJECTED
+
+    dynamodb = abl.get_dynamodb()
+    for coid, entry in list(journal.entries.items()):
+        if (entry.get("state") == FILLED and journal.purpose(coid) == "AVG"
+                and not entry.get("level_persisted") and entry.get("level") is not None):
+            if update_averaging_level(dynamodb, entry["symbol"], entry["level"]):
+                journal.record(coid, FILLED, level_persisted=True)
+
+    filled = 0
+    for coid in journal.pending_status("AVG"):
+        entry = journal.get(coid)
+        symbol = entry.get("symbol")
+        try:
+            state, price, status = abl.order_outcome(abl.fetch_order_details(entry["order_id"]))
+        except Exception as e:
+            logging.error(f"⚠️ Could not read order status for {symbol}: {e}")
+            continue
+
+        if state == REJECTED:
+            logging.warning(f"🚫 {symbol} averaging order {entry['order_id']} ended {status}")
+            journal.record(coid, REJECTED, status=status)
+            continue
+        if state != FILLED:
+            # Still open (or unknown): stays ACK and is checked again next run.
+            logging.info(f"⏳ {symbol} averaging order {entry['order_id']} not complete yet ({status or 'no status'})")
+            continue
+
+        if not update_averaging_level(dynamodb, symbol, entry["level"]):
+            logging.error(f"⚠️ AveragingLevel not persisted for {symbol}; will retry next run")
+            continue
+        journal.record(coid, FILLED, price=price, status=status, level_persisted=True)
+        filled += 1
+    return filled
+
+
+def update_averaging_level(dynamodb, instrument_name, level):
+    """Persist the highest ladder rung bought for an instrument. Returns True on success."""
+    if get_settings().dry_run:
+        logging.info(f"🧪 [dry run] AveragingLevel for {instrument_name} would be {level}")
+        return True
+    try:
+        dynamodb.update_item(
+            TableName=get_settings().stock_table,
+            Key={
+                "InstrumentName": {"S": instrument_name},
+                "Eligibility": {"S": "Eligible"}
+            },
+            UpdateExpression="SET AveragingLevel = :lv",
+            ExpressionAttributeValues={":lv": {"N": str(int(level))}}
+        )
+        logging.info(f"✅ AveragingLevel for {instrument_name} set to {level}")
+        return True
+    except Exception as e:
+        logging.error(f"Error updating AveragingLevel for {instrument_name}: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    run()
@@ -5,17 +5,36 @@ Automated first-day order placement logic for eligible stocks.
 Fetches stock data from DynamoDB, places MTF buy orders via Rupeezy (Vortex API),
 and updates BaseValue and FirstDayProcessed flags.
 
+With settings.dry_run (DRY_RUN=true, or run_mode.txt set to PAPER/OFF) every
+order, order-status, quote and holdings call is routed to a PaperBroker
+instead, DynamoDB is only read, and orders go to a separate paper journal.
+
 Author: Chaitanya / DSG Project
 """
 
 import logging
-import os
 import boto3
+import requests
 from vortex_api import AsthaTradeVortexAPI, Constants as Vc
-from decimal import Decimal
 import time
+import threading
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from botocore.exceptions import ClientError
 
+from brokers.paper_broker import PaperBroker
+from brokers.position_book import PositionBook
+from config import get_settings
+from brokers.Rupeezy.instruments import load_instruments, lookup as lookup_instrument
+from brokers.Rupeezy.portfolio import parse_holdings
+from orchestrator.market_calendar import is_session_open, next_session_open, now_ist, sleep_until
+from orchestrator.rate_limiter import RateLimiter, get_rate_limiter
+from storage.stock_state import states_from_dynamo
+from storage.order_journal import (
+    OrderJournal, make_client_order_id, INTENT, SUBMITTED, ACK, FILLED, REJECTED, FAILED
+)
+
 # ============================================================
 # 1️⃣ Logging Setup
 # ============================================================
@@ -29,32 +48,89 @@ logging.basicConfig(
 # 2️⃣ DynamoDB Client
 # ============================================================
 
-dynamodb = boto3.client('dynamodb', region_name='ap-south-1')
+# Clients are resolved from the current settings on every use (and cached per
+# region / credential set), so a hot reload takes effect without a restart.
+
+@lru_cache(maxsize=4)
+def _dynamodb_for(region):
+    return boto3.client('dynamodb', region_name=region)
+
+
+def get_dynamodb():
+    """DynamoDB client for the configured region."""
+    return _dynamodb_for(get_settings().aws_region)
 
 # ============================================================
 # 3️⃣ API Client Setup
 # ============================================================
 
-api_secret = os.getenv("RUPEEZY_API_KEY")
-application_id = os.getenv("RUPEEZY_APPLICATION_ID")
-access_token = os.getenv("RUPEEZY_ACCESS_TOKEN")
+@lru_cache(maxsize=4)
+def _client_for(api_secret, application_id, access_token):
+    client = AsthaTradeVortexAPI(api_secret, application_id)
+    client.access_token = access_token
+    return client
+
+
+def get_client():
+    """Vortex client for the configured credentials."""
+    settings = get_settings()
+    return _client_for(settings.rupeezy_api_key, settings.rupeezy_application_id,
+                       settings.rupeezy_access_token)
+
+# Per-process limiter: each orchestrator target gets its own budget
+rate_limiter = get_rate_limiter()
+
+# Order staging modes (settings.staging_mode): "" = submit immediately,
+# "amo" = after-market orders, "open" = hold the staged batch for the next
+# session open (orchestrator.market_calendar)
+
+# Broker order statuses that end an order's life
+COMPLETE_STATUSES = {"EXECUTED", "COMPLETE", "COMPLETED", "FILLED", "TRADED"}
+REJECTED_STATUSES = {"REJECTED", "CANCELLED", "CANCELED", "EXPIRED", "LAPSED"}
+
+# ============================================================
+# 4️⃣ Dry-run Routing
+# ============================================================
+
+_paper = None
+_paper_lock = threading.Lock()
+
+
+def dry_run():
+    return get_settings().dry_run
+
 
-client = AsthaTradeVortexAPI(api_secret, application_id)
-client.access_token = access_token
+def paper_broker():
+    """Process-wide PaperBroker used when dry_run is on."""
+    global _paper
+    with _paper_lock:
+        if _paper is None:
+            settings = get_settings()
+            _paper = PaperBroker(cash=settings.paper_cash, latency=settings.paper_latency,
+                                 slippage_bps=settings.paper_slippage_bps,
+                                 spread_bps=settings.paper_spread_bps)
+            logging.info(f"🧪 Dry run: orders go to a PaperBroker (cash={_paper.cash:,.0f}, "
+                         f"latency={settings.paper_latency}s, slippage={settings.paper_slippage_bps}bps, "
+                         f"spread={settings.paper_spread_bps}bps)")
+        return _paper
+
+
+def _symbols_by_token():
+    return {info["token"]: symbol for symbol, info in load_instruments().items()}
 
 # ============================================================
-# 4️⃣ DynamoDB Helpers
+# 5️⃣ DynamoDB Helpers
 # ============================================================
 
 def fetch_eligible_stocks():
-    """Fetch all eligible stocks from DynamoDB."""
+    """Fetch all eligible stocks from DynamoDB as StockState rows."""
     try:
-        response = dynamodb.scan(
-            TableName="StockEligibility",
+        response = get_dynamodb().scan(
+            TableName=get_settings().stock_table,
             FilterExpression="EligibilityStatus = :status",
             ExpressionAttributeValues={":status": {"S": "Eligible"}}
         )
-        items = response.get("Items", [])
+        items = states_from_dynamo(response.get("Items", []))
         logging.info(f"Fetched {len(items)} eligible stocks from DynamoDB.")
         return items
     except ClientError as e:
@@ -66,10 +142,13 @@ def fetch_eligible_stocks():
 
 
 def update_base_value(instrument_name, base_value):
-    """Update the BaseValue for a given instrument."""
+    """Update the BaseValue for a given instrument. Returns True on success."""
+    if dry_run():
+        logging.info(f"🧪 [dry run] BaseValue for {instrument_name} would be {base_value}")
+        return True
     try:
-        dynamodb.update_item(
-            TableName="StockEligibility",
+        get_dynamodb().update_item(
+            TableName=get_settings().stock_table,
             Key={
                 "InstrumentName": {"S": instrument_name},
                 "Eligibility": {"S": "Eligible"}
@@ -78,15 +157,20 @@ def update_base_value(instrument_name, base_value):
             ExpressionAttributeValues={":bv": {"N": str(base_value)}}
         )
         logging.info(f"✅ BaseValue updated for {instrument_name}: {base_value}")
+        return True
     except Exception as e:
         logging.error(f"Error updating BaseValue for {instrument_name}: {e}")
+        return False
 
 
 def update_first_day_processed(instrument_name):
-    """Set FirstDayProcessed = True for the given instrument."""
+    """Set FirstDayProcessed = True for the given instrument. Returns True on success."""
+    if dry_run():
+        logging.info(f"🧪 [dry run] FirstDayProcessed for {instrument_name} would be set")
+        return True
     try:
-        dynamodb.update_item(
-            TableName="StockEligibility",
+        get_dynamodb().update_item(
+            TableName=get_settings().stock_table,
             Key={
                 "InstrumentName": {"S": instrument_name},
                 "Eligibility": {"S": "Eligible"}
@@ -95,15 +179,48 @@ def update_first_day_processed(instrument_name):
             ExpressionAttributeValues={":flag": {"BOOL": True}}
         )
         logging.info(f"✅ FirstDayProcessed flag set for {instrument_name}")
+        return True
     except Exception as e:
         logging.error(f"Error updating FirstDayProcessed for {instrument_name}: {e}")
+        return False
 
 # ============================================================
-# 5️⃣ Broker API Helpers
+# 6️⃣ Broker API Helpers
 # ============================================================
 
-def place_order(order_details):
-    """Place a market or limit order with retry logic."""
+def _never_sent(exc):
+    """
+    True only for errors raised before the request left this host (connection
+    refused, host unreachable, connect timeout). Anything later - read
+    timeouts, dropped connections, HTTP errors - may already have reached
+    the broker.
+    """
+    if isinstance(exc, (ConnectionRefusedError, requests.exceptions.ConnectTimeout)):
+        return True
+    if isinstance(exc, requests.exceptions.ConnectionError) and exc.args:
+        reason = getattr(exc.args[0], "reason", None)
+        return type(reason).__name__ in ("NewConnectionError", "ConnectTimeoutError")
+    return False
+
+
+def place_order(order_details, limiter=None):
+    """
+    Place a market or limit order.
+
+    Only errors raised before the request was sent are retried; any other
+    failure returns None straight away, since the order may have reached the
+    broker and a resend could fill it twice. None therefore does not mean the
+    order was refused: callers must treat it as in doubt.
+
+    `limiter` overrides the process-wide rate limiter (used for the open burst).
+    """
+    if dry_run():
+        limit = None if order_details["variety"] == "RL-MKT" else order_details["price"]
+        response = paper_broker().place_order(order_details["symbol"], order_details["quantity"],
+                                              order_details["transaction_type"], limit)
+        logging.info(f"🧪 Paper order for {order_details['symbol']}: {response}")
+        return response
+
     retries, delay = 3, 5
     for attempt in range(retries):
         try:
@@ -113,7 +230,8 @@ def place_order(order_details):
                 else Vc.VarietyTypes.REGULAR_LIMIT_ORDER
             )
 
-            response = client.place_order(
+            (limiter or rate_limiter).acquire()
+            response = get_client().place_order(
                 exchange=Vc.ExchangeTypes.NSE_EQUITY,
                 token=order_details["token"],
                 transaction_type=Vc.TransactionSides.BUY
@@ -125,25 +243,37 @@ def place_order(order_details):
                 price=order_details["price"],
                 trigger_price=order_details["trigger_price"],
                 disclosed_quantity=order_details["disclosed_quantity"],
-                validity=Vc.ValidityTypes.FULL_DAY,
+                # The SDK has no is_amo flag: after-market orders are a validity type.
+                validity=(Vc.ValidityTypes.AFTER_MARKET if order_details.get("is_amo")
+                          else Vc.ValidityTypes.FULL_DAY),
             )
 
             logging.info(f"✅ Order placed for {order_details['symbol']}: {response}")
             return response
         except Exception as e:
-            logging.error(f"Order failed (attempt {attempt+1}/3): {e}")
+            if not _never_sent(e):
+                logging.error(f"Order for {order_details['symbol']} may have been sent, not retrying: {e}")
+                return None
+            logging.error(f"Order not sent (attempt {attempt+1}/{retries}): {e}")
             if attempt < retries - 1:
                 time.sleep(delay)
-            else:
-                return None
+    return None
 
 
 def fetch_order_details(order_id):
     """Fetch details for a given order ID."""
+    if dry_run():
+        order = paper_broker().order_status(order_id)
+        if not order:
+            return {"data": []}
+        return {"data": [{"status": order["status"], "average_price": order.get("fill_price"),
+                          "order_price": order.get("limit")}]}
+
     retries, delay = 3, 5
     for attempt in range(retries):
         try:
-            response = client.order_history(order_id)
+            rate_limiter.acquire()
+            response = get_client().order_history(order_id)
             logging.debug(f"Order details: {response}")
             return response
         except Exception as e:
@@ -154,24 +284,291 @@ def fetch_order_details(order_id):
                 return None
 
 
+def order_outcome(order_info):
+    """
+    Classify an order_history reply.
+
+    Returns:
+        tuple: (state, price, status) where state is FILLED, REJECTED or None
+        (still open / unknown), and price is the traded price when available.
+    """
+    history = (order_info or {}).get("data") or []
+    for item in history:
+        status = str(item.get("status", "")).upper()
+        if status in COMPLETE_STATUSES:
+            price = 0.0
+            for field in ("average_price", "traded_price", "order_price", "price"):
+                price = float(item.get(field) or 0)
+                if price > 0:
+                    break
+            return FILLED, price, status
+        if status in REJECTED_STATUSES:
+            return REJECTED, None, status
+    status = str(history[0].get("status", "")).upper() if history else ""
+    return None, None, status
+
+
 def fetch_positions():
     """Fetch current positions from Rupeezy."""
+    if dry_run():
+        positions = paper_broker().get_holdings()
+        logging.info(f"🧪 Paper holdings: {positions}")
+        return positions
     try:
-        positions = client.positions()
+        rate_limiter.acquire()
+        positions = get_client().positions()
         logging.info(f"📊 Current Positions: {positions}")
         return positions
     except Exception as e:
         logging.error(f"Error fetching positions: {e}")
         return None
 
+
+def fetch_ltps(tokens):
+    """Fetch LTPs for many NSE_EQ tokens in a single quotes call. Returns {token: ltp}."""
+    if not tokens:
+        return {}
+    if dry_run():
+        return _paper_ltps(tokens)
+    try:
+        instruments = [f"NSE_EQ-{t}" for t in tokens]
+        rate_limiter.acquire()
+        response = get_client().quotes(instruments, Vc.QuoteModes.LTP)
+        data = response.get("data", {}) or {}
+        return {
+            int(key.split("-", 1)[1]): float(quote.get("last_trade_price", 0) or 0)
+            for key, quote in data.items()
+            if quote
+        }
+    except Exception as e:
+        logging.error(f"Error fetching LTPs: {e}")
+        return {}
+
+
+def _paper_ltps(tokens):
+    """
+    Quotes in dry run come from the PaperBroker. Tokens it has no price for are
+    primed once from the live (read-only) quote API, so paper fills happen at
+    real prices.
+    """
+    broker = paper_broker()
+    names = _symbols_by_token()
+    missing = [t for t in tokens if names.get(t) and broker.get_ltp(names[t]) is None]
+    if missing:
+        try:
+            rate_limiter.acquire()
+            response = get_client().quotes([f"NSE_EQ-{t}" for t in missing], Vc.QuoteModes.LTP)
+            for key, quote in (response.get("data", {}) or {}).items():
+                token = int(key.split("-", 1)[1])
+                ltp = float((quote or {}).get("last_trade_price", 0) or 0)
+                if ltp > 0 and token in names:
+                    broker.on_tick(names[token], ltp)
+        except Exception as e:
+            logging.error(f"Error priming paper quotes: {e}")
+    prices = {}
+    for t in tokens:
+        ltp = broker.get_ltp(names[t]) if t in names else None
+        if ltp:
+            prices[t] = ltp
+    return prices
+
+
+def load_position_book():
+    """Seed a PositionBook from current holdings, positions and funds (once per run)."""
+    book = PositionBook(margin_factor=get_settings().mtf_margin_factor)
+    if dry_run():
+        book.seed_from_broker(paper_broker())
+        return book
+    held = {}
+
+    try:
+        rate_limiter.acquire()
+        parse_holdings(get_client().holdings(), held)
+    except Exception as e:
+        logging.error(f"Error fetching holdings: {e}")
+
+    try:
+        rate_limiter.acquire()
+        data = (get_client().positions() or {}).get("data", {}) or {}
+        for item in data.get("net", []) if isinstance(data, dict) else data:
+            symbol = item.get("symbol")
+            qty = item.get("quantity", 0) or 0
+            if symbol:
+                held[symbol] = held.get(symbol, 0) + int(qty)
+    except Exception as e:
+        logging.error(f"Error fetching positions: {e}")
+
+    available = None
+    try:
+        rate_limiter.acquire()
+        funds = get_client().funds() or {}
+        nse = funds.get("nse", funds.get("data", {})) or {}
+        if "net_available" in nse:
+            available = float(nse["net_available"])
+    except Exception as e:
+        logging.error(f"Error fetching funds: {e}")
+
+    book.seed(held, available)
+    return book
+
 # ============================================================
-# 6️⃣ Core Execution Logic
+# 7️⃣ Core Execution Logic
 # ============================================================
 
 def run(broker=None):
     """Entry point for orchestrator-compatible execution."""
     run_auto_buy_flow()
 
+def stage_orders(eligible_stocks, journal, book, ltps, staging_mode=""):
+    """
+    Compute and validate the full first-day order set without sending anything.
+
+    Each order is checked against the instrument registry, the journal and the
+    position/margin book, and its INTENT is journaled (one fsync for the batch).
+    """
+    staged = []
+    for stock in eligible_stocks:
+        instrument_name = stock.instrument
+        default_qty = stock.default_qty
+
+        if default_qty == 0:
+            logging.info(f"⏭ Skipping {instrument_name} (DefaultQuantity=0)")
+            continue
+
+        if stock.token is None:
+            logging.error(f"⏭ Skipping {instrument_name}: no Token on the row")
+            continue
+
+        listed = lookup_instrument(instrument_name)
+        if listed is None or listed["token"] != stock.token:
+            logging.error(f"⏭ Skipping {instrument_name}: token {stock.token} does not match "
+                          f"the instrument registry ({listed})")
+            continue
+
+        coid = make_client_order_id(instrument_name, "FIRSTDAY")
+        if not journal.should_submit(coid):
+            logging.info(f"⏭ Skipping {instrument_name}: journal state {journal.state(coid)} ({coid})")
+            continue
+
+        est_price = ltps.get(stock.token)
+        ok, reason = book.check(instrument_name, default_qty, est_price)
+        if not ok:
+            logging.warning(f"🚫 Rejected locally: {instrument_name} ({reason})")
+            continue
+        # Reserve as we stage so the batch as a whole must fit the margin.
+        book.on_ack(instrument_name, default_qty, est_price)
+
+        journal.record(coid, INTENT, purpose="FIRSTDAY", symbol=instrument_name, token=stock.token,
+                       quantity=default_qty, est_price=est_price,
+                       base_value=stock.base_value)
+        staged.append({
+            "coid": coid,
+            "symbol": instrument_name,
+            "token": stock.token,
+            "transaction_type": "BUY",
+            "variety": "RL-MKT",
+            "quantity": default_qty,
+            "price": 0.0,
+            "trigger_price": 0.0,
+            "disclosed_quantity": 0,
+            "is_amo": staging_mode == "amo",
+            "est_price": est_price,
+        })
+
+    journal.sync()
+    logging.info(f"🗂 Staged {len(staged)} orders (mode: {staging_mode or 'immediate'})")
+    return staged
+
+
+def seconds_until_open(now=None):
+    """
+    Seconds until the next NSE session open; 0 while a session is running.
+    After the close (or on a holiday) this is the next trading day's 09:15.
+    """
+    now = now or now_ist()
+    if is_session_open(now):
+        return 0.0
+    return (next_session_open(now) - now).total_seconds()
+
+
+def submit_staged(staged, journal, book, staging_mode="", workers=16):
+    """
+    Send a staged batch concurrently.
+
+    In "open" mode every worker is parked on an event that is released at the
+    next session open, so the whole batch goes out in one burst. SUBMITTED is
+    journaled for the whole batch with one fsync before the release, so the
+    burst is not spaced out by per-order fsyncs.
+
+    The burst draws on its own token bucket rather than the process limiter,
+    whose tokens the quote and holdings calls have already spent: the first
+    settings.open_burst_orders orders leave together at the open and the rest
+    follow at settings.broker_rate_limit per second. The broker's own order
+    rate limit is the real ceiling, so open_burst_orders must not exceed it.
+
+    Returns:
+        set: Client order IDs acknowledged by the broker in this call.
+    """
+    if not staged:
+        return set()
+
+    limiter = None
+    if staging_mode == "open":
+        settings = get_settings()
+        limiter = RateLimiter(rate=settings.broker_rate_limit, burst=settings.open_burst_orders)
+
+    go = threading.Event()
+    aborted = threading.Event()
+
+    def submit(order):
+        go.wait()
+        if aborted.is_set():
+            return None
+        coid, instrument_name = order["coid"], order["symbol"]
+        response = place_order(order, limiter)
+        if not response:
+            # Exceptions / timeouts: the order may be at the broker. Leave it
+            # SUBMITTED (in doubt) and keep the margin reserved.
+            logging.error(f"❓ No broker response for {instrument_name}; left in doubt ({coid})")
+            return None
+
+        order_id = response.get("data", {}).get("orderId")
+        if order_id:
+            journal.record(coid, ACK, order_id=order_id)
+            logging.info(f"🆔 Order ID journaled: {order_id} ({coid})")
+            return coid
+        else:
+            logging.warning(f"⚠️ No orderId found for {instrument_name}")
+            journal.record(coid, FAILED, reason="no orderId", response=response)
+            book.on_reject(instrument_name, order["quantity"], order["est_price"])
+            return None
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(staged)))) as pool:
+        futures = [pool.submit(submit, order) for order in staged]
+
+        try:
+            if staging_mode == "open":
+                wait = seconds_until_open()
+                if wait > 0:
+                    open_at = next_session_open()
+                    logging.info(f"⏳ Holding {len(staged)} staged orders for the open at "
+                                 f"{open_at:%Y-%m-%d %H:%M} IST ({wait:.0f}s)")
+                    # Coarse sleep, then a short spin so the release lands on the open.
+                    sleep_until(open_at - timedelta(seconds=0.05))
+                    while now_ist() < open_at:
+                        pass
+
+            journal.record_many([order["coid"] for order in staged], SUBMITTED)
+        except BaseException:
+            # Interrupted while holding: release the parked workers without sending.
+            aborted.set()
+            raise
+        finally:
+            go.set()
+
+        return {coid for coid in (future.result() for future in futures) if coid}
+
+
 def run_auto_buy_flow():
     """Main function to fetch eligible stocks and place first-day buy orders."""
     eligible_stocks = fetch_eligible_stocks()
@@ -180,59 +577,72 @@ def run_auto_buy_flow():
         logging.info("⚠️ No eligible stocks found in DynamoDB.")
         return
 
-    with open("order_ids.txt", "w") as order_file:
-        for stock in eligible_stocks:
-            instrument_name = stock["InstrumentName"]["S"]
-            default_qty = int(stock.get("DefaultQuantity", {}).get("N", 0))
-            base_value = Decimal(stock.get("BaseValue", {}).get("N", "-1"))
-            first_day = stock.get("FirstDayProcessed", {}).get("BOOL", False)
+    # One snapshot of holdings/margin plus one batched quote call, so orders
+    # that would be rejected never leave the process.
+    book = load_position_book()
+    ltps = fetch_ltps([s.token for s in eligible_stocks if s.token is not None])
+
+    settings = get_settings()
+    with OrderJournal(settings.journal_path) as journal:
+        for coid in journal.in_doubt():
+            logging.warning(f"❓ {coid} was submitted before a crash with no broker response; "
+                            f"not resubmitting — reconcile manually.")
+
+        # Phase 1: stage and validate everything, then submit as one batch.
+        staged = stage_orders(eligible_stocks, journal, book, ltps, settings.staging_mode)
+        acked = submit_staged(staged, journal, book, settings.staging_mode, settings.staging_workers)
+
+        journal.sync()
+
+        # Phase 2: one settle wait, then confirm every acknowledged first-day
+        # order (including ones acknowledged by a previous, crashed run).
+        # Averaging orders share the journal but are confirmed by additional_quantity.
+        # AMO orders placed by this run only execute at the next open, so they
+        # are confirmed by a later run; earlier runs' AMO acks are checked now.
+        pending = journal.pending_status("FIRSTDAY")
+        if settings.staging_mode == "amo":
+            pending = [coid for coid in pending if coid not in acked]
+        if pending:
+            time.sleep(10)
 
-            if default_qty == 0:
-                logging.info(f"⏭ Skipping {instrument_name} (DefaultQuantity=0)")
-                continue
+        for coid in pending:
+            entry = journal.get(coid)
+            instrument_name = entry.get("symbol")
+            order_info = fetch_order_details(entry["order_id"])
 
-            order = {
-                "symbol": instrument_name,
-                "token": int(stock["Token"]["N"]),
-                "transaction_type": "BUY",
-                "variety": "RL-MKT",
-                "quantity": default_qty,
-                "price": 0.0,
-                "trigger_price": 0.0,
-                "disclosed_quantity": 0,
-            }
-
-            response = place_order(order)
-            if not response:
-                logging.error(f"❌ Failed to place order for {instrument_name}")
+            try:
+                state, price, status = order_outcome(order_info)
+            except Exception as e:
+                logging.error(f"⚠️ Could not read order status for {instrument_name}: {e}")
                 continue
 
-            order_id = response.get("data", {}).get("orderId")
-            if order_id:
-                order_file.write(f"{order_id}\n")
-                logging.info(f"🆔 Order ID logged: {order_id}")
-            else:
-                logging.warning(f"⚠️ No orderId found for {instrument_name}")
+            if state == REJECTED:
+                logging.warning(f"🚫 {instrument_name} order {entry['order_id']} ended {status}")
+                journal.record(coid, REJECTED, status=status)
+                book.on_reject(instrument_name, entry.get("quantity", 0), entry.get("est_price"))
+                continue
+            if state != FILLED:
+                # Still open (or unknown): stays ACK and is checked again next run.
+                logging.info(f"⏳ {instrument_name} order {entry['order_id']} not complete yet ({status or 'no status'})")
                 continue
 
-            # Wait and fetch order details
-            time.sleep(10)
-            order_info = fetch_order_details(order_id)
+            book.on_fill(instrument_name, entry.get("quantity", 0), price, entry.get("est_price"))
+
+            # Update BaseValue if not set yet; FILLED is journaled only once
+            # Dynamo reflects the fill, otherwise the next run retries.
+            if not (entry.get("base_value") or 0) > 0:
+                if not (update_base_value(instrument_name, price)
+                        and update_first_day_processed(instrument_name)):
+                    logging.error(f"⚠️ Base not persisted for {instrument_name}; will retry next run")
+                    continue
 
-            # Update BaseValue if not set yet
-            if base_value <= 0:
-                try:
-                    price = order_info["data"][0].get("order_price", 0)
-                    update_base_value(instrument_name, price)
-                    update_first_day_processed(instrument_name)
-                except Exception as e:
-                    logging.error(f"⚠️ Error updating base for {instrument_name}: {e}")
+            journal.record(coid, FILLED, price=price, status=status)
 
     fetch_positions()
     logging.info("🏁 Auto-buy flow complete.")
 
 # ============================================================
-# 7️⃣ CLI Entrypoint
+# 8️⃣ CLI Entrypoint
 # ============================================================
 
 if __name__ == "__main__":